@@ -0,0 +1,6 @@
+"""
+Root pytest configuration.
+
+Its presence makes pytest put the project root on sys.path, so the
+top-level packages import without path hacks.
+"""
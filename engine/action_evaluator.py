@@ -455,7 +455,7 @@ class ActionEvaluator:
         # Simplified removal detection
         removal_keywords = ['destroy', 'exile', 'damage', 'counter']
         for keyword in removal_keywords:
-            if keyword in spell.name.lower() or keyword in spell.oracle_text.lower():
+            if keyword in spell.name_lower or keyword in spell.oracle_text.lower():
                 return True
         return False
     
@@ -463,7 +463,7 @@ class ActionEvaluator:
         """Check if a spell draws cards."""
         draw_keywords = ['draw', 'card']
         for keyword in draw_keywords:
-            if keyword in spell.name.lower() or keyword in spell.oracle_text.lower():
+            if keyword in spell.name_lower or keyword in spell.oracle_text.lower():
                 return True
         return False
     
@@ -471,7 +471,7 @@ class ActionEvaluator:
         """Check if a spell deals damage."""
         damage_keywords = ['damage', 'bolt', 'shock', 'fire']
         for keyword in damage_keywords:
-            if keyword in spell.name.lower() or keyword in spell.oracle_text.lower():
+            if keyword in spell.name_lower or keyword in spell.oracle_text.lower():
                 return True
         return False
     
@@ -494,7 +494,7 @@ class ActionEvaluator:
         """Check if an artifact produces mana."""
         mana_keywords = ['mana', 'tapping', 'add']
         for keyword in mana_keywords:
-            if keyword in spell.name.lower() or keyword in spell.oracle_text.lower():
+            if keyword in spell.name_lower or keyword in spell.oracle_text.lower():
                 return True
         return False
     
@@ -8,6 +8,7 @@ Provides the foundation for heuristic decision-making.
 
 from typing import List, Dict, Optional, Set, Any, Tuple
 from datetime import datetime
+import copy
 import logging
 
 from state.game_state import GameState, GameStatus
@@ -33,9 +34,9 @@ class BoardState:
         self.opponent_life = self.opponent_player.life_total if self.opponent_player else 20
         self.life_difference = self.self_life - self.opponent_life
         
-        # Creature metrics
-        self.self_creatures = self.self_player.battlefield.get_creatures() if self.self_player else []
-        self.opponent_creatures = self.opponent_player.battlefield.get_creatures() if self.opponent_player else []
+        # Creature metrics (read-only snapshots)
+        self.self_creatures = self.self_player.battlefield.get_creatures() if self.self_player else ()
+        self.opponent_creatures = self.opponent_player.battlefield.get_creatures() if self.opponent_player else ()
         
         # Mana metrics
         self.self_mana = self.self_player.get_mana_summary() if self.self_player else {}
@@ -48,6 +49,13 @@ class BoardState:
         # Land metrics
         self.self_lands = self.self_player.get_land_count() if self.self_player else 0
         self.opponent_lands = self.opponent_player.get_land_count() if self.opponent_player else 0
+    
+    def clone(self, **overrides: Any) -> 'BoardState':
+        """Return a shallow copy with the given metrics replaced."""
+        board_state = copy.copy(self)
+        for name, value in overrides.items():
+            setattr(board_state, name, value)
+        return board_state
 
 class BoardEvaluator:
     """Evaluates board states and assigns scores."""
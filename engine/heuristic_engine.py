@@ -239,7 +239,7 @@ class HeuristicEngine:
                 # Check for removal keywords
                 removal_keywords = ['destroy', 'exile', 'damage', 'counter']
                 for keyword in removal_keywords:
-                    if keyword in spell.name.lower() or keyword in spell.oracle_text.lower():
+                    if keyword in spell.name_lower or keyword in spell.oracle_text.lower():
                         return True
         return False
     
@@ -295,7 +295,7 @@ class ThreatAssessor:
             priority = 3
             
             threat = Threat(
-                source=CardInfo(
+                source=CardInfo.model_construct(
                     instance_id=0,
                     grp_id=0,
                     name="Hand Advantage",
@@ -334,7 +334,7 @@ class ThreatAssessor:
             priority = 2
             
             threat = Threat(
-                source=CardInfo(
+                source=CardInfo.model_construct(
                     instance_id=0,
                     grp_id=0,
                     name="Mana Advantage",
@@ -356,7 +356,7 @@ class ThreatAssessor:
         # Simplified threat detection
         threatening_keywords = ['destroy', 'damage', 'counter', 'discard', 'exile']
         for keyword in threatening_keywords:
-            if keyword in enchantment.name.lower() or keyword in enchantment.oracle_text.lower():
+            if keyword in enchantment.name_lower or keyword in enchantment.oracle_text.lower():
                 return True
         return False
     
@@ -365,7 +365,7 @@ class ThreatAssessor:
         # Simplified threat detection
         threatening_keywords = ['destroy', 'damage', 'counter', 'discard', 'exile']
         for keyword in threatening_keywords:
-            if keyword in artifact.name.lower() or keyword in artifact.oracle_text.lower():
+            if keyword in artifact.name_lower or keyword in artifact.oracle_text.lower():
                 return True
         return False
     
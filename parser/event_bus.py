@@ -186,6 +186,9 @@ class EventBus:
                 self.host,
                 self.port
             )
+            if self.port == 0:
+                # Report the ephemeral port the OS picked
+                self.port = self.server.sockets[0].getsockname()[1]
             self.is_running = True
             logger.info(f"Event bus server started on {self.host}:{self.port}")
             
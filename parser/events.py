@@ -5,9 +5,10 @@ Event Schema Definitions
 Pydantic models for MTGA game events parsed from log files.
 """
 
+import re
 from datetime import datetime
-from typing import List, Optional, Dict, Any, Union
-from pydantic import BaseModel, Field
+from typing import List, Optional, Dict, Any, Tuple, Union, get_args
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
 from enum import Enum
 
 class EventType(str, Enum):
@@ -77,8 +78,42 @@ class BaseEvent(BaseModel):
     priority_player: Optional[int] = None
     raw_data: Optional[Dict[str, Any]] = None
 
+# Card type bits, one per CardType in declaration order
+CARD_TYPE_BITS = {card_type: 1 << index for index, card_type in enumerate(CardType)}
+
+# Mana color bits, in mana pool order
+MANA_COLOR_BITS = {
+    'white': 1 << 0,
+    'blue': 1 << 1,
+    'black': 1 << 2,
+    'red': 1 << 3,
+    'green': 1 << 4,
+    'colorless': 1 << 5,
+}
+ALL_MANA_COLORS_MASK = (1 << 6) - 1
+
+# Land name fragments and the colors they produce (simplified)
+_LAND_NAME_TO_MASK = {
+    'plains': MANA_COLOR_BITS['white'],
+    'white': MANA_COLOR_BITS['white'],
+    'island': MANA_COLOR_BITS['blue'],
+    'blue': MANA_COLOR_BITS['blue'],
+    'swamp': MANA_COLOR_BITS['black'],
+    'black': MANA_COLOR_BITS['black'],
+    'mountain': MANA_COLOR_BITS['red'],
+    'red': MANA_COLOR_BITS['red'],
+    'forest': MANA_COLOR_BITS['green'],
+    'green': MANA_COLOR_BITS['green'],
+}
+
+# Words in ability text, without the punctuation around them
+_WORD_RE = re.compile(r"[a-z]+")
+
 class CardInfo(BaseModel):
     """Card information."""
+    # Frozen, so the values derived at construction never go stale
+    model_config = ConfigDict(frozen=True)
+    
     instance_id: int
     grp_id: int  # Arena card ID
     name: str
@@ -86,15 +121,79 @@ class CardInfo(BaseModel):
     cmc: int = 0
     power: Optional[int] = None
     toughness: Optional[int] = None
-    card_types: List[CardType] = []
-    colors: List[str] = []
-    abilities: List[str] = []
-    keywords: List[str] = []
+    card_types: Tuple[CardType, ...] = ()
+    colors: Tuple[str, ...] = ()
+    abilities: Tuple[str, ...] = ()
+    keywords: Tuple[str, ...] = ()
     controller: int
     zone_id: int
     zone_type: Optional[ZoneType] = None
     visibility: str = "visible"
     counters: Dict[str, int] = {}
+    
+    # Derived from the name, abilities and types once at construction
+    _name_lower: str = PrivateAttr(default="")
+    _mana_colors_mask: int = PrivateAttr(default=0)
+    _produces_mana: bool = PrivateAttr(default=False)
+    _keyword_set: frozenset = PrivateAttr(default=frozenset())
+    _has_counter: bool = PrivateAttr(default=False)
+    _card_type_mask: int = PrivateAttr(default=0)
+    
+    def model_post_init(self, __context) -> None:
+        name = self._name_lower = self.name.lower()
+        # All lands can produce colorless mana
+        mask = MANA_COLOR_BITS['colorless']
+        for fragment, bit in _LAND_NAME_TO_MASK.items():
+            if fragment in name:
+                mask |= bit
+        self._mana_colors_mask = mask
+        self._produces_mana = 'mana' in name
+        self._keyword_set = keywords = frozenset(
+            token for ability in self.abilities for token in _WORD_RE.findall(ability.lower())
+        )
+        # Matches "counter", "counters", "countered", ... as the ability text did
+        self._has_counter = any("counter" in token for token in keywords)
+        type_mask = 0
+        for card_type in self.card_types:
+            type_mask |= CARD_TYPE_BITS[card_type]
+        self._card_type_mask = type_mask
+    
+    def model_copy(self, *, update: Optional[Dict[str, Any]] = None, deep: bool = False) -> "CardInfo":
+        copy = super().model_copy(update=update, deep=deep)
+        if update:
+            # Updated fields bypass construction; derive the values again
+            copy.model_post_init(None)
+        return copy
+    
+    @property
+    def name_lower(self) -> str:
+        """Lowercased card name, computed once."""
+        return self._name_lower
+    
+    @property
+    def mana_colors_mask(self) -> int:
+        """Bitmask of colors this card can produce as a land."""
+        return self._mana_colors_mask
+    
+    @property
+    def produces_mana(self) -> bool:
+        """Whether this card is a mana-producing artifact."""
+        return self._produces_mana
+    
+    @property
+    def keyword_set(self) -> frozenset:
+        """Lowercase words appearing in this card's abilities."""
+        return self._keyword_set
+    
+    @property
+    def card_type_mask(self) -> int:
+        """Bitmask of this card's types (see CARD_TYPE_BITS)."""
+        return self._card_type_mask
+    
+    @property
+    def has_counter(self) -> bool:
+        """Whether any of this card's abilities counters something."""
+        return self._has_counter
 
 class GameStartEvent(BaseEvent):
     """Game start event."""
@@ -240,6 +339,12 @@ GameEvent = Union[
     UnknownEvent
 ]
 
+# Event type -> event class, for rebuilding typed events from serialized data
+EVENT_CLASSES: Dict[EventType, type] = {
+    event_class.model_fields['event_type'].default: event_class
+    for event_class in get_args(GameEvent)
+}
+
 def create_event_from_data(event_type: EventType, data: Dict[str, Any]) -> GameEvent:
     """Create an event instance from parsed data."""
     # This would be implemented to parse specific event types
@@ -7,11 +7,12 @@ Handles Unity log format and GRE (Game Rules Engine) messages.
 """
 
 import re
-import json
 import logging
 from typing import List, Optional, Dict, Any, Iterator
 from datetime import datetime
 
+import orjson
+
 from .events import (
     GameEvent, EventType, Phase, ZoneType, CardType,
     GameStartEvent, DrawCardEvent, PlayCardEvent, LifeChangeEvent,
@@ -20,6 +21,8 @@ from .events import (
 
 logger = logging.getLogger(__name__)
 
+UNITY_LOG_PREFIX = '[UnityCrossThreadLogger]'
+
 class MTGALogParser:
     def __init__(self, card_cache=None):
         self.card_cache = card_cache
@@ -52,7 +55,10 @@ class MTGALogParser:
         """
         try:
             # Check if this is a Unity log line
-            unity_match = self.unity_log_pattern.match(line.strip())
+            line = line.strip()
+            if not line.startswith(UNITY_LOG_PREFIX):
+                return None
+            unity_match = self.unity_log_pattern.match(line)
             if not unity_match:
                 return None
             
@@ -61,8 +67,8 @@ class MTGALogParser:
             
             # Try to parse JSON
             try:
-                data = json.loads(json_str)
-            except json.JSONDecodeError as e:
+                data = orjson.loads(json_str)
+            except orjson.JSONDecodeError as e:
                 logger.debug(f"Failed to parse JSON: {e}")
                 return None
             
@@ -71,13 +71,15 @@ class MTGALogPath:
         logger.warning("MTGA log file not found in default locations")
         return None
     
-    def get_sample_log_path(self) -> Path:
+    def get_sample_log_path(self, output_dir: Optional[Path] = None) -> Path:
         """Get path to sample log file for testing."""
+        if output_dir is not None:
+            return Path(output_dir) / "sample_output_log.txt"
         return Path("tests/sample_logs/sample_output_log.txt")
     
-    def create_sample_log(self) -> bool:
+    def create_sample_log(self, output_dir: Optional[Path] = None) -> bool:
         """Create a sample log file for testing if it doesn't exist."""
-        sample_path = self.get_sample_log_path()
+        sample_path = self.get_sample_log_path(output_dir)
         
         if sample_path.exists():
             logger.info(f"Sample log already exists: {sample_path}")
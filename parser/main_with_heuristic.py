@@ -22,6 +22,13 @@ from parser.log_parser import MTGALogParser
 from parser.file_tailer import BufferedLogTailer
 from state.state_integration import StateIntegrationManager
 from engine.heuristic_engine import HeuristicEngine
+from parser.events import EventType
+
+# Events after which recommendations are refreshed
+_RECOMMENDATION_EVENTS = frozenset([
+    EventType.PHASE_CHANGE, EventType.PLAY_CARD,
+    EventType.DRAW_CARD, EventType.LIFE_CHANGE,
+])
 
 # Configure logging
 logging.basicConfig(
@@ -220,10 +227,7 @@ class MTGACoachWithHeuristic:
     def _should_generate_recommendations(self, event) -> bool:
         """Check if we should generate AI recommendations."""
         # Generate recommendations on phase changes, card plays, etc.
-        if hasattr(event, 'event_type'):
-            if event.event_type in ['phase_change', 'play_card', 'draw_card', 'life_change']:
-                return True
-        return False
+        return event.event_type in _RECOMMENDATION_EVENTS
     
     async def _generate_ai_recommendations(self):
         """Generate AI recommendations for the current game state."""
@@ -41,7 +41,7 @@ class CardRestriction:
     def is_exception(self, card: CardInfo) -> bool:
         """Check if a card is an exception to this restriction."""
         for exception in self.exceptions:
-            if exception in card.name.lower():
+            if exception in card.name_lower:
                 return True
         
         return False
@@ -310,7 +310,7 @@ class CardRestrictionEngine:
     def _can_play_legendary(self, card: CardInfo, player: PlayerState) -> bool:
         """Check if a player can play a legendary card."""
         # Check if player already controls a legendary with the same name
-        for battlefield_card in player.battlefield.get_all_cards():
+        for battlefield_card in player.battlefield.iter_all_cards():
             if (battlefield_card.name == card.name and 
                 self._is_legendary(battlefield_card)):
                 return False
@@ -320,7 +320,7 @@ class CardRestrictionEngine:
     def _can_play_planeswalker(self, card: CardInfo, player: PlayerState) -> bool:
         """Check if a player can play a planeswalker."""
         # Check if player already controls a planeswalker with the same name
-        for battlefield_card in player.battlefield.get_all_cards():
+        for battlefield_card in player.battlefield.iter_all_cards():
             if (battlefield_card.name == card.name and 
                 CardType.PLANESWALKER in battlefield_card.card_types):
                 return False
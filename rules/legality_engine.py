@@ -7,8 +7,8 @@ Implements Magic: The Gathering rules and timing restrictions.
 """
 
 from typing import List, Dict, Optional, Set, Any
-from datetime import datetime
 import logging
+import time
 
 from state.game_state import GameState, GameStatus
 from state.player_state import PlayerState, PlayerType
@@ -30,15 +30,15 @@ class LegalityEngine:
     def __init__(self, game_state: GameState):
         self.game_state = game_state
         self.legal_actions_cache: Dict[str, List[Action]] = {}
-        self.cache_timestamp: Optional[datetime] = None
+        self.cache_timestamp: Optional[float] = None  # time.monotonic() of last fill
         self.cache_duration = 1.0  # seconds
     
     def get_legal_actions(self, player_id: int, force_refresh: bool = False) -> List[Action]:
         """Get all legal actions for a player."""
         # Check cache
         if not force_refresh and self._is_cache_valid():
-            cached_actions = self.legal_actions_cache.get(str(player_id), [])
-            if cached_actions:
+            cached_actions = self.legal_actions_cache.get(str(player_id))
+            if cached_actions is not None:
                 return cached_actions
         
         # Generate legal actions
@@ -46,7 +46,7 @@ class LegalityEngine:
         
         # Cache results
         self.legal_actions_cache[str(player_id)] = legal_actions
-        self.cache_timestamp = datetime.now()
+        self.cache_timestamp = time.monotonic()
         
         return legal_actions
     
@@ -84,7 +84,7 @@ class LegalityEngine:
         if self.cache_timestamp is None:
             return False
         
-        elapsed = (datetime.now() - self.cache_timestamp).total_seconds()
+        elapsed = time.monotonic() - self.cache_timestamp
         return elapsed < self.cache_duration
     
     def _generate_legal_actions(self, player_id: int) -> List[Action]:
@@ -157,7 +157,7 @@ class LegalityEngine:
                 actions.append(action)
         
         # Activate abilities
-        for card in player.battlefield.get_all_cards():
+        for card in player.battlefield.iter_all_cards():
             if self._can_activate_ability(card, player):
                 for ability in card.abilities:
                     action = ActivateAbilityAction(
@@ -7,8 +7,8 @@ Provides a unified interface for determining legal actions.
 """
 
 from typing import List, Dict, Optional, Set, Any
-from datetime import datetime
 import logging
+import time
 
 from state.game_state import GameState, GameStatus
 from state.player_state import PlayerState
@@ -33,9 +33,13 @@ class LegalityIntegration:
         
         # Cache for legal actions
         self.legal_actions_cache: Dict[int, List[Action]] = {}
-        self.cache_timestamp: Optional[datetime] = None
+        self.cache_timestamp: Optional[float] = None  # time.monotonic() of last fill
         self.cache_duration = 1.0  # seconds
     
+    def close(self) -> None:
+        """Detach the legality components from the game state."""
+        self.timing_rules.close()
+    
     def get_legal_actions(self, player_id: int, force_refresh: bool = False) -> List[Action]:
         """Get all legal actions for a player."""
         # Check cache
@@ -49,7 +53,7 @@ class LegalityIntegration:
         
         # Cache results
         self.legal_actions_cache[player_id] = legal_actions
-        self.cache_timestamp = datetime.now()
+        self.cache_timestamp = time.monotonic()
         
         return legal_actions
     
@@ -168,7 +172,11 @@ class LegalityIntegration:
     
     def pass_priority(self, player_id: int) -> bool:
         """Pass priority for a player."""
-        return self.timing_rules.pass_priority(player_id)
+        try:
+            return self.timing_rules.pass_priority(player_id)
+        except Exception as e:
+            logger.error("Error passing priority for player %s: %s", player_id, e)
+            return False
     
     def get_card_restrictions(self, card: CardInfo) -> List[str]:
         """Get all restrictions that apply to a card."""
@@ -241,7 +249,7 @@ class LegalityIntegration:
                 actions.append(action)
         
         # Activate abilities
-        for card in player.battlefield.get_all_cards():
+        for card in player.battlefield.iter_all_cards():
             for ability in card.abilities:
                 if self.can_activate_ability(card, ability, player):
                     from rules.action_types import ActivateAbilityAction
@@ -393,7 +401,7 @@ class LegalityIntegration:
         if self.cache_timestamp is None:
             return False
         
-        elapsed = (datetime.now() - self.cache_timestamp).total_seconds()
+        elapsed = time.monotonic() - self.cache_timestamp
         return elapsed < self.cache_duration
     
     def clear_cache(self) -> None:
@@ -7,20 +7,203 @@ Implements Magic: The Gathering mana rules and restrictions.
 """
 
 from typing import List, Dict, Optional, Set, Any, Tuple
+from collections import defaultdict, deque
 from datetime import datetime
+from enum import IntEnum
+from functools import lru_cache
 import re
 import logging
 
-from state.player_state import PlayerState, ManaPool
-from parser.events import CardInfo, CardType
+from state.player_state import PlayerState, ManaPool, MANA_COLORS
+from parser.events import CardInfo, CardType, ALL_MANA_COLORS_MASK
 from rules.action_types import Action, ActionType
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of payments kept per player in the spending history
+MANA_HISTORY_LIMIT = 1024
+
+# Distinct cost strings whose parsed costs are kept for sharing
+MANA_COST_CACHE_SIZE = 4096
+
+# Matches the inside of each {...} mana symbol
+_MANA_SYMBOL_RE = re.compile(r'\{([^}]+)\}')
+
+class Color(IntEnum):
+    """Mana colors, indexed in mana pool order."""
+    WHITE = 0
+    BLUE = 1
+    BLACK = 2
+    RED = 3
+    GREEN = 4
+    COLORLESS = 5
+
+# Pool attribute for each color, indexed by Color
+_COLOR_ATTRS = MANA_COLORS
+
+# Color names accepted at the public API boundary
+_NAME_TO_COLOR = {attr: Color(i) for i, attr in enumerate(_COLOR_ATTRS)}
+
+# Single mana symbols and their color
+_SYMBOL_TO_COLOR = {
+    'W': Color.WHITE,
+    'U': Color.BLUE,
+    'B': Color.BLACK,
+    'R': Color.RED,
+    'G': Color.GREEN,
+    'C': Color.COLORLESS,
+}
+
+# Single mana symbols and the pool attribute they draw from
+_SYMBOL_TO_ATTR = {symbol: _COLOR_ATTRS[color] for symbol, color in _SYMBOL_TO_COLOR.items()}
+
+# Single mana symbols and their color bit
+_SYMBOL_TO_BIT = {symbol: 1 << color for symbol, color in _SYMBOL_TO_COLOR.items()}
+
+# Life paid for a Phyrexian symbol when its color is not available
+_PHYREXIAN_LIFE_COST = 2
+
+# Order in which generic costs drain the mana pool
+_GENERIC_SPILL_ORDER = _COLOR_ATTRS
+
+def _to_color(color) -> Optional[Color]:
+    """Convert a color name (or Color) to a Color, or None if unknown."""
+    if isinstance(color, Color):
+        return color
+    return _NAME_TO_COLOR.get(color)
+
+def _spill_generic(mana_pool: ManaPool, amount: int) -> bool:
+    """Drain generic mana from the pool in bulk, one color at a time."""
+    remaining = amount
+    for attr in _GENERIC_SPILL_ORDER:
+        if not remaining:
+            break
+        available = getattr(mana_pool, attr)
+        if available <= 0:
+            continue
+        take = available if available < remaining else remaining
+        mana_pool.spend(attr, take)
+        remaining -= take
+    return remaining == 0
+
+def _parse_color_mask(symbol: str) -> int:
+    """Get the mask of colors named in a split symbol (e.g. "W/P")."""
+    color_mask = 0
+    for option in symbol.split('/'):
+        color_mask |= _SYMBOL_TO_BIT.get(option, 0)
+    return color_mask
+
+def _parse_hybrid_options(symbol: str) -> Tuple[Tuple[int, int], ...]:
+    """Split a hybrid symbol once into its options, in the order written.
+    
+    Each option is (color bit, 0) for a colored option or (0, amount) for a
+    generic one.
+    """
+    options = []
+    for option in symbol.split('/'):
+        if option in _SYMBOL_TO_BIT:
+            options.append((_SYMBOL_TO_BIT[option], 0))
+        elif option.isdigit():
+            options.append((0, int(option)))
+    return tuple(options)
+
+def _take_colored(scratch: List[int], color_mask: int) -> bool:
+    """Take one mana of any color in the mask from a scratch pool."""
+    for i in Color:
+        if color_mask & (1 << i) and scratch[i] > 0:
+            scratch[i] -= 1
+            return True
+    return False
+
+def _take_generic(scratch: List[int], amount: int) -> bool:
+    """Take generic mana from a scratch pool in spill order."""
+    remaining = amount
+    for i, available in enumerate(scratch):
+        if not remaining:
+            break
+        take = available if available < remaining else remaining
+        scratch[i] = available - take
+        remaining -= take
+    return remaining == 0
+
+def _plan_hybrid(cost: 'ManaCost', scratch: List[int], index: int,
+                 life_total: int) -> Optional[Tuple[List[int], int]]:
+    """Plan the hybrid symbols from index on, then the Phyrexian and generic mana.
+    
+    Each hybrid symbol takes the first option, in the order written, that
+    leaves the rest of the cost payable.
+    """
+    if index < len(cost._hybrid_options):
+        for color_bit, generic in cost._hybrid_options[index]:
+            trial = scratch.copy()
+            if color_bit:
+                if not _take_colored(trial, color_bit):
+                    continue
+            elif sum(trial) < generic:
+                continue
+            else:
+                _take_generic(trial, generic)
+            plan = _plan_hybrid(cost, trial, index + 1, life_total)
+            if plan is not None:
+                return plan
+        return None
+    
+    # Phyrexian mana: the colored mana while enough is left for the generic
+    # cost, otherwise 2 life
+    life_to_pay = cost.life
+    spare = sum(scratch) - cost.generic
+    for color_mask in cost._phyrexian_masks:
+        if spare > 0 and _take_colored(scratch, color_mask):
+            spare -= 1
+        else:
+            life_to_pay += _PHYREXIAN_LIFE_COST
+    if life_total < life_to_pay:
+        return None
+    
+    # Generic mana last, from whatever is left
+    if not _take_generic(scratch, cost.generic):
+        return None
+    
+    return scratch, life_to_pay
+
+def _pool_values(mana_pool: ManaPool) -> Tuple[int, ...]:
+    """Read the pool's six color counts in spill order."""
+    return (mana_pool.white, mana_pool.blue, mana_pool.black,
+            mana_pool.red, mana_pool.green, mana_pool.colorless)
+
+def _can_pay_numeric(pool: Tuple[int, ...], colored: Tuple[int, ...], generic: int,
+                     energy: int, life: int, energy_counters: int, life_total: int) -> bool:
+    """Flat integer core of the payability check (colored, generic, energy, life)."""
+    available = 0
+    for have, need in zip(pool, colored):
+        if have < need:
+            return False
+        available += have - need
+    return (available >= generic and
+            energy_counters >= energy and
+            life_total >= life)
+
 class ManaCost:
-    """Represents a mana cost."""
+    """Represents a mana cost.
+    
+    Instances are immutable once parsed; use ManaCost.get() to share one
+    instance per cost string.
+    """
+    
+    __slots__ = ('cost_string', 'white', 'blue', 'black', 'red', 'green',
+                 'colorless', 'generic', 'hybrid', 'phyrexian', 'snow',
+                 'energy', 'life', '_hybrid_options', '_phyrexian_masks',
+                 '_colored_sum', '_total', '_is_colorless', '_colored',
+                 '_is_simple', '_color_count', '_frozen')
+    
+    @classmethod
+    @lru_cache(maxsize=MANA_COST_CACHE_SIZE)
+    def get(cls, cost_string: str) -> 'ManaCost':
+        """Get the shared, parsed cost for a cost string."""
+        return cls(cost_string)
     
     def __init__(self, cost_string: str):
+        self._frozen = False
         self.cost_string = cost_string
         self.white = 0
         self.blue = 0
@@ -34,8 +217,13 @@ class ManaCost:
         self.snow = 0
         self.energy = 0
         self.life = 0
+        # Per hybrid symbol: its options in the order written (see _parse_hybrid_options)
+        self._hybrid_options: List[Tuple[Tuple[int, int], ...]] = []
+        # Per Phyrexian symbol: color mask payable instead of life
+        self._phyrexian_masks: List[int] = []
         
         self._parse_cost()
+        self._finalize()
     
     def _parse_cost(self) -> None:
         """Parse the mana cost string."""
@@ -46,31 +234,20 @@ class ManaCost:
         cost = self.cost_string.replace(' ', '').upper()
         
         # Parse individual mana symbols
-        symbols = re.findall(r'\{[^}]+\}', cost)
-        
-        for symbol in symbols:
-            symbol = symbol[1:-1]  # Remove { and }
-            
-            if symbol == 'W':
-                self.white += 1
-            elif symbol == 'U':
-                self.blue += 1
-            elif symbol == 'B':
-                self.black += 1
-            elif symbol == 'R':
-                self.red += 1
-            elif symbol == 'G':
-                self.green += 1
-            elif symbol == 'C':
-                self.colorless += 1
+        for symbol in _MANA_SYMBOL_RE.findall(cost):
+            attr = _SYMBOL_TO_ATTR.get(symbol)
+            if attr is not None:
+                setattr(self, attr, getattr(self, attr) + 1)
             elif symbol.isdigit():
                 self.generic += int(symbol)
-            elif '/' in symbol:
-                # Hybrid mana
-                self.hybrid.append(symbol)
             elif 'P' in symbol:
-                # Phyrexian mana
+                # Phyrexian mana (e.g. "W/P")
                 self.phyrexian.append(symbol)
+                self._phyrexian_masks.append(_parse_color_mask(symbol))
+            elif '/' in symbol:
+                # Hybrid mana (e.g. "W/U", "2/U")
+                self.hybrid.append(symbol)
+                self._hybrid_options.append(_parse_hybrid_options(symbol))
             elif 'S' in symbol:
                 # Snow mana
                 self.snow += 1
@@ -81,11 +258,36 @@ class ManaCost:
                 # Life
                 self.life += 1
     
+    def _finalize(self) -> None:
+        """Precompute derived totals; the cost is immutable after parsing."""
+        self.hybrid = tuple(self.hybrid)
+        self.phyrexian = tuple(self.phyrexian)
+        self._hybrid_options = tuple(self._hybrid_options)
+        self._phyrexian_masks = tuple(self._phyrexian_masks)
+        self._colored_sum = (self.white + self.blue + self.black + self.red +
+                             self.green + self.colorless)
+        self._total = (self._colored_sum + self.generic + len(self.hybrid) +
+                       len(self.phyrexian) + self.snow)
+        self._is_colorless = (self._colored_sum == self.colorless and
+                              len(self.hybrid) == 0)
+        self._colored = (self.white, self.blue, self.black, self.red,
+                         self.green, self.colorless)
+        # Only colored and generic mana: payable without any special handling
+        self._is_simple = not (self.hybrid or self.phyrexian or self.snow or
+                               self.energy or self.life)
+        self._color_count = ((self.white > 0) + (self.blue > 0) + (self.black > 0) +
+                             (self.red > 0) + (self.green > 0))
+        self._frozen = True
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        # Parsed costs are shared between callers; build a new ManaCost to adjust one
+        if getattr(self, '_frozen', False):
+            raise AttributeError(f"ManaCost is immutable; cannot set {name!r}")
+        object.__setattr__(self, name, value)
+    
     def get_total_cost(self) -> int:
         """Get total mana cost."""
-        return (self.white + self.blue + self.black + self.red + 
-                self.green + self.colorless + self.generic + 
-                len(self.hybrid) + len(self.phyrexian) + self.snow)
+        return self._total
     
     def get_colored_cost(self) -> Dict[str, int]:
         """Get colored mana cost."""
@@ -98,25 +300,21 @@ class ManaCost:
             'colorless': self.colorless
         }
     
-    def get_hybrid_cost(self) -> List[str]:
+    def get_hybrid_cost(self) -> Tuple[str, ...]:
         """Get hybrid mana cost."""
-        return self.hybrid.copy()
+        return self.hybrid
     
-    def get_phyrexian_cost(self) -> List[str]:
+    def get_phyrexian_cost(self) -> Tuple[str, ...]:
         """Get Phyrexian mana cost."""
-        return self.phyrexian.copy()
+        return self.phyrexian
     
     def is_colorless(self) -> bool:
         """Check if cost is colorless."""
-        return (self.white == 0 and self.blue == 0 and self.black == 0 and 
-                self.red == 0 and self.green == 0 and len(self.hybrid) == 0)
+        return self._is_colorless
     
     def is_mono_colored(self) -> bool:
         """Check if cost is mono-colored."""
-        colored_count = sum([
-            self.white, self.blue, self.black, self.red, self.green
-        ])
-        return colored_count == 1 and len(self.hybrid) == 0
+        return self._color_count == 1 and len(self.hybrid) == 0
     
     def get_primary_color(self) -> Optional[str]:
         """Get the primary color of the cost."""
@@ -132,452 +330,219 @@ class ManaCost:
             return 'green'
         return None
 
+# Costs that are always payable
+_FREE_COSTS = frozenset(['', '{0}'])
+
+
 class ManaSystem:
     """Mana system for Magic: The Gathering."""
     
-    def __init__(self, game_state):
+    def __init__(self, game_state, record_history: bool = False):
         self.game_state = game_state
+        self.record_history = record_history
         self.mana_pool_history: Dict[int, List[ManaPool]] = {}
-        self.mana_spent_history: Dict[int, List[Dict[str, int]]] = {}
+        # Bounded per player so long-running sessions don't grow without limit
+        self.mana_spent_history: Dict[int, deque] = defaultdict(
+            lambda: deque(maxlen=MANA_HISTORY_LIMIT)
+        )
+        # player_id -> (battlefield, revision, producible color mask)
+        self._gen_cache: Dict[int, Tuple[Any, int, int]] = {}
     
     def can_pay_cost(self, cost_string: str, player: PlayerState) -> bool:
         """Check if a player can pay a mana cost."""
         try:
-            if not cost_string:
+            if cost_string in _FREE_COSTS:
                 return True
             
-            cost = ManaCost(cost_string)
+            cost = ManaCost.get(cost_string)
+            
+            # Fast path for costs made only of colored and generic mana
+            if cost._is_simple:
+                return _can_pay_numeric(_pool_values(player.mana_pool), cost._colored,
+                                        cost.generic, 0, 0, 0, 0)
+            
             return self._can_pay_mana_cost(cost, player)
             
         except Exception as e:
             logger.error(f"Error checking mana cost: {e}")
             return False
     
+    def can_pay_many(self, cost_strings: List[str], player: PlayerState) -> List[bool]:
+        """Check several mana costs against the same player in one call."""
+        pool = _pool_values(player.mana_pool)
+        energy_counters = player.energy_counters
+        life_total = player.life_total
+        
+        results = []
+        for cost_string in cost_strings:
+            # A malformed cost fails on its own, as it would in can_pay_cost
+            try:
+                if cost_string in _FREE_COSTS:
+                    results.append(True)
+                    continue
+                
+                cost = ManaCost.get(cost_string)
+                payable = _can_pay_numeric(pool, cost._colored, cost.generic, cost.energy,
+                                           cost.life, energy_counters, life_total)
+                if payable and not cost._is_simple:
+                    payable = self._can_pay_mana_cost(cost, player)
+            except Exception as e:
+                logger.error(f"Error checking mana cost: {e}")
+                payable = False
+            results.append(payable)
+        
+        return results
+    
     def pay_cost(self, cost_string: str, player: PlayerState) -> bool:
         """Pay a mana cost."""
         try:
-            if not cost_string:
+            if cost_string in _FREE_COSTS:
                 return True
             
-            cost = ManaCost(cost_string)
-            if not self._can_pay_mana_cost(cost, player):
-                return False
+            cost = ManaCost.get(cost_string)
             
-            # Pay the cost
-            return self._pay_mana_cost(cost, player)
+            # Fast path for costs made only of colored and generic mana
+            if cost._is_simple:
+                mana_pool = player.mana_pool
+                if not _can_pay_numeric(_pool_values(mana_pool), cost._colored,
+                                        cost.generic, 0, 0, 0, 0):
+                    return False
+                for attr, amount in zip(_GENERIC_SPILL_ORDER, cost._colored):
+                    if amount:
+                        mana_pool.spend(attr, amount)
+                _spill_generic(mana_pool, cost.generic)
+                self._record_mana_spent(cost, player)
+                return True
+            
+            return self._try_pay(cost, player)
             
         except Exception as e:
             logger.error(f"Error paying mana cost: {e}")
             return False
     
     def _can_pay_mana_cost(self, cost: ManaCost, player: PlayerState) -> bool:
-        """Check if player can pay a mana cost."""
-        # Check basic mana
-        if not self._can_pay_basic_mana(cost, player):
-            return False
-        
-        # Check hybrid mana
-        if not self._can_pay_hybrid_mana(cost, player):
-            return False
-        
-        # Check Phyrexian mana
-        if not self._can_pay_phyrexian_mana(cost, player):
-            return False
-        
-        # Check snow mana
-        if not self._can_pay_snow_mana(cost, player):
-            return False
-        
-        # Check energy
-        if not self._can_pay_energy(cost, player):
-            return False
-        
-        # Check life
-        if not self._can_pay_life(cost, player):
-            return False
-        
-        return True
-    
-    def _can_pay_basic_mana(self, cost: ManaCost, player: PlayerState) -> bool:
-        """Check if player can pay basic mana costs."""
-        mana_pool = player.mana_pool
-        
-        # Check colored mana
-        if mana_pool.white < cost.white:
-            return False
-        if mana_pool.blue < cost.blue:
-            return False
-        if mana_pool.black < cost.black:
-            return False
-        if mana_pool.red < cost.red:
-            return False
-        if mana_pool.green < cost.green:
-            return False
-        if mana_pool.colorless < cost.colorless:
-            return False
-        
-        # Check generic mana
-        available_generic = mana_pool.total_mana() - (
-            cost.white + cost.blue + cost.black + cost.red + cost.green + cost.colorless
-        )
-        if available_generic < cost.generic:
-            return False
-        
-        return True
-    
-    def _can_pay_hybrid_mana(self, cost: ManaCost, player: PlayerState) -> bool:
-        """Check if player can pay hybrid mana costs."""
-        mana_pool = player.mana_pool
-        
-        for hybrid in cost.hybrid:
-            if not self._can_pay_hybrid_symbol(hybrid, mana_pool):
-                return False
-        
-        return True
-    
-    def _can_pay_hybrid_symbol(self, symbol: str, mana_pool: ManaPool) -> bool:
-        """Check if player can pay a hybrid mana symbol."""
-        # Parse hybrid symbol (e.g., "W/U", "2/U", "W/P")
-        if '/' not in symbol:
-            return False
-        
-        options = symbol.split('/')
-        
-        # Check if player can pay any of the options
-        for option in options:
-            if self._can_pay_mana_symbol(option, mana_pool):
-                return True
-        
-        return False
-    
-    def _can_pay_mana_symbol(self, symbol: str, mana_pool: ManaPool) -> bool:
-        """Check if player can pay a single mana symbol."""
-        if symbol == 'W':
-            return mana_pool.white > 0
-        elif symbol == 'U':
-            return mana_pool.blue > 0
-        elif symbol == 'B':
-            return mana_pool.black > 0
-        elif symbol == 'R':
-            return mana_pool.red > 0
-        elif symbol == 'G':
-            return mana_pool.green > 0
-        elif symbol == 'C':
-            return mana_pool.colorless > 0
-        elif symbol.isdigit():
-            return mana_pool.total_mana() >= int(symbol)
-        else:
-            return False
-    
-    def _can_pay_phyrexian_mana(self, cost: ManaCost, player: PlayerState) -> bool:
-        """Check if player can pay Phyrexian mana costs."""
-        for phyrexian in cost.phyrexian:
-            if not self._can_pay_phyrexian_symbol(phyrexian, player):
-                return False
-        
-        return True
-    
-    def _can_pay_phyrexian_symbol(self, symbol: str, player: PlayerState) -> bool:
-        """Check if player can pay a Phyrexian mana symbol."""
-        # Phyrexian mana can be paid with 2 life or the appropriate mana
-        if 'P' in symbol:
-            # Check if player has enough life
-            if player.life_total >= 2:
-                return True
-            
-            # Check if player has the appropriate mana
-            color = symbol.replace('P', '')
-            if color == 'W':
-                return player.mana_pool.white > 0
-            elif color == 'U':
-                return player.mana_pool.blue > 0
-            elif color == 'B':
-                return player.mana_pool.black > 0
-            elif color == 'R':
-                return player.mana_pool.red > 0
-            elif color == 'G':
-                return player.mana_pool.green > 0
-            elif color == 'C':
-                return player.mana_pool.colorless > 0
-        
-        return False
+        """Check if player can pay a mana cost, by planning the payment without applying it."""
+        return self._plan_payment(cost, player) is not None
     
     def _can_pay_snow_mana(self, cost: ManaCost, player: PlayerState) -> bool:
         """Check if player can pay snow mana costs."""
         # Simplified snow mana check - would need to track snow permanents
         return cost.snow == 0  # For now, assume no snow mana required
     
-    def _can_pay_energy(self, cost: ManaCost, player: PlayerState) -> bool:
-        """Check if player can pay energy costs."""
-        return player.energy_counters >= cost.energy
-    
-    def _can_pay_life(self, cost: ManaCost, player: PlayerState) -> bool:
-        """Check if player can pay life costs."""
-        return player.life_total >= cost.life
-    
-    def _pay_mana_cost(self, cost: ManaCost, player: PlayerState) -> bool:
-        """Pay a mana cost."""
-        try:
-            # Pay basic mana
-            if not self._pay_basic_mana(cost, player):
-                return False
-            
-            # Pay hybrid mana
-            if not self._pay_hybrid_mana(cost, player):
-                return False
-            
-            # Pay Phyrexian mana
-            if not self._pay_phyrexian_mana(cost, player):
-                return False
-            
-            # Pay snow mana
-            if not self._pay_snow_mana(cost, player):
-                return False
-            
-            # Pay energy
-            if not self._pay_energy(cost, player):
-                return False
-            
-            # Pay life
-            if not self._pay_life(cost, player):
-                return False
-            
-            # Record mana spent
-            self._record_mana_spent(cost, player)
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error paying mana cost: {e}")
-            return False
-    
-    def _pay_basic_mana(self, cost: ManaCost, player: PlayerState) -> bool:
-        """Pay basic mana costs."""
-        mana_pool = player.mana_pool
+    def _plan_payment(self, cost: ManaCost, player: PlayerState) -> Optional[Tuple[List[int], int]]:
+        """Work out the pool left and the life paid for a cost, or None if it cannot be paid."""
+        # Snow mana and energy are not drawn from the pool
+        if not self._can_pay_snow_mana(cost, player):
+            return None
+        if player.energy_counters < cost.energy:
+            return None
         
-        # Pay colored mana
-        mana_pool.white -= cost.white
-        mana_pool.blue -= cost.blue
-        mana_pool.black -= cost.black
-        mana_pool.red -= cost.red
-        mana_pool.green -= cost.green
-        mana_pool.colorless -= cost.colorless
+        scratch = list(_pool_values(player.mana_pool))
         
-        # Pay generic mana
-        generic_paid = 0
-        while generic_paid < cost.generic:
-            if mana_pool.white > 0:
-                mana_pool.white -= 1
-            elif mana_pool.blue > 0:
-                mana_pool.blue -= 1
-            elif mana_pool.black > 0:
-                mana_pool.black -= 1
-            elif mana_pool.red > 0:
-                mana_pool.red -= 1
-            elif mana_pool.green > 0:
-                mana_pool.green -= 1
-            elif mana_pool.colorless > 0:
-                mana_pool.colorless -= 1
-            else:
-                return False
-            generic_paid += 1
+        # Colored mana
+        for i, need in enumerate(cost._colored):
+            if scratch[i] < need:
+                return None
+            scratch[i] -= need
         
-        return True
+        return _plan_hybrid(cost, scratch, 0, player.life_total)
     
-    def _pay_hybrid_mana(self, cost: ManaCost, player: PlayerState) -> bool:
-        """Pay hybrid mana costs."""
-        for hybrid in cost.hybrid:
-            if not self._pay_hybrid_symbol(hybrid, player):
-                return False
-        
-        return True
-    
-    def _pay_hybrid_symbol(self, symbol: str, player: PlayerState) -> bool:
-        """Pay a hybrid mana symbol."""
-        options = symbol.split('/')
-        
-        # Try to pay with the first available option
-        for option in options:
-            if self._can_pay_mana_symbol(option, player.mana_pool):
-                return self._pay_mana_symbol(option, player.mana_pool)
-        
-        return False
-    
-    def _pay_mana_symbol(self, symbol: str, mana_pool: ManaPool) -> bool:
-        """Pay a single mana symbol."""
-        if symbol == 'W':
-            mana_pool.white -= 1
-        elif symbol == 'U':
-            mana_pool.blue -= 1
-        elif symbol == 'B':
-            mana_pool.black -= 1
-        elif symbol == 'R':
-            mana_pool.red -= 1
-        elif symbol == 'G':
-            mana_pool.green -= 1
-        elif symbol == 'C':
-            mana_pool.colorless -= 1
-        elif symbol.isdigit():
-            amount = int(symbol)
-            for _ in range(amount):
-                if mana_pool.white > 0:
-                    mana_pool.white -= 1
-                elif mana_pool.blue > 0:
-                    mana_pool.blue -= 1
-                elif mana_pool.black > 0:
-                    mana_pool.black -= 1
-                elif mana_pool.red > 0:
-                    mana_pool.red -= 1
-                elif mana_pool.green > 0:
-                    mana_pool.green -= 1
-                elif mana_pool.colorless > 0:
-                    mana_pool.colorless -= 1
-                else:
-                    return False
-        else:
+    def _try_pay(self, cost: ManaCost, player: PlayerState) -> bool:
+        """Pay a mana cost, committing only if the whole cost can be paid."""
+        plan = self._plan_payment(cost, player)
+        if plan is None:
             return False
+        scratch, life_to_pay = plan
         
-        return True
-    
-    def _pay_phyrexian_mana(self, cost: ManaCost, player: PlayerState) -> bool:
-        """Pay Phyrexian mana costs."""
-        for phyrexian in cost.phyrexian:
-            if not self._pay_phyrexian_symbol(phyrexian, player):
-                return False
+        # Commit
+        mana_pool = player.mana_pool
+        for attr, value in zip(_GENERIC_SPILL_ORDER, scratch):
+            spent = getattr(mana_pool, attr) - value
+            if spent:
+                mana_pool.spend(attr, spent)
+        player.energy_counters -= cost.energy
+        if life_to_pay:
+            player.take_damage(life_to_pay)
         
-        return True
-    
-    def _pay_phyrexian_symbol(self, symbol: str, player: PlayerState) -> bool:
-        """Pay a Phyrexian mana symbol."""
-        if 'P' in symbol:
-            # Try to pay with mana first
-            color = symbol.replace('P', '')
-            if self._can_pay_mana_symbol(color, player.mana_pool):
-                return self._pay_mana_symbol(color, player.mana_pool)
-            
-            # Otherwise pay with life
-            if player.life_total >= 2:
-                player.take_damage(2)
-                return True
+        # Record mana spent
+        self._record_mana_spent(cost, player)
         
-        return False
-    
-    def _pay_snow_mana(self, cost: ManaCost, player: PlayerState) -> bool:
-        """Pay snow mana costs."""
-        # Simplified snow mana payment
-        return cost.snow == 0
-    
-    def _pay_energy(self, cost: ManaCost, player: PlayerState) -> bool:
-        """Pay energy costs."""
-        if player.energy_counters >= cost.energy:
-            player.energy_counters -= cost.energy
-            return True
-        return False
-    
-    def _pay_life(self, cost: ManaCost, player: PlayerState) -> bool:
-        """Pay life costs."""
-        if player.life_total >= cost.life:
-            player.take_damage(cost.life)
-            return True
-        return False
+        return True
     
     def _record_mana_spent(self, cost: ManaCost, player: PlayerState) -> None:
         """Record mana spent for history."""
-        if player.player_id not in self.mana_spent_history:
-            self.mana_spent_history[player.player_id] = []
-        
-        spent = {
-            'white': cost.white,
-            'blue': cost.blue,
-            'black': cost.black,
-            'red': cost.red,
-            'green': cost.green,
-            'colorless': cost.colorless,
-            'generic': cost.generic,
-            'hybrid': cost.hybrid.copy(),
-            'phyrexian': cost.phyrexian.copy(),
-            'snow': cost.snow,
-            'energy': cost.energy,
-            'life': cost.life
-        }
+        if not self.record_history:
+            return
         
-        self.mana_spent_history[player.player_id].append(spent)
+        # Costs are immutable after parsing, so keep a reference
+        self.mana_spent_history[player.player_id].append(cost)
     
-    def get_mana_history(self, player_id: int) -> List[Dict[str, int]]:
+    def get_mana_history(self, player_id: int) -> List[Dict[str, Any]]:
         """Get mana spending history for a player."""
-        return self.mana_spent_history.get(player_id, [])
+        return [
+            {
+                'white': cost.white,
+                'blue': cost.blue,
+                'black': cost.black,
+                'red': cost.red,
+                'green': cost.green,
+                'colorless': cost.colorless,
+                'generic': cost.generic,
+                'hybrid': list(cost.hybrid),
+                'phyrexian': list(cost.phyrexian),
+                'snow': cost.snow,
+                'energy': cost.energy,
+                'life': cost.life
+            }
+            for cost in self.mana_spent_history.get(player_id, ())
+        ]
     
     def can_generate_mana(self, player: PlayerState, color: str, amount: int = 1) -> bool:
         """Check if a player can generate mana of a specific color."""
-        # Check if player has lands that can produce that color
-        for land in player.battlefield.lands:
-            if self._land_can_produce_mana(land, color):
-                return True
-        
-        # Check if player has artifacts that can produce mana
-        for artifact in player.battlefield.artifacts:
-            if self._artifact_can_produce_mana(artifact, color):
-                return True
+        color = _to_color(color)
+        if color is None:
+            return False
+        return self._can_generate_color(player, color)
+    
+    def _can_generate_color(self, player: PlayerState, color: Color) -> bool:
+        """Check if a player can generate mana of a color."""
+        return bool(self._get_mana_mask(player) & (1 << color))
+    
+    def _get_mana_mask(self, player: PlayerState) -> int:
+        """Get the mask of colors a player's permanents can produce, cached per battlefield revision."""
+        battlefield = player.battlefield
+        cached = self._gen_cache.get(player.player_id)
+        if cached is not None and cached[0] is battlefield and cached[1] == battlefield.revision:
+            return cached[2]
         
-        return False
-    
-    def _land_can_produce_mana(self, land: CardInfo, color: str) -> bool:
-        """Check if a land can produce mana of a specific color."""
-        # Simplified land mana production
-        if color == 'white':
-            return 'plains' in land.name.lower() or 'white' in land.name.lower()
-        elif color == 'blue':
-            return 'island' in land.name.lower() or 'blue' in land.name.lower()
-        elif color == 'black':
-            return 'swamp' in land.name.lower() or 'black' in land.name.lower()
-        elif color == 'red':
-            return 'mountain' in land.name.lower() or 'red' in land.name.lower()
-        elif color == 'green':
-            return 'forest' in land.name.lower() or 'green' in land.name.lower()
-        elif color == 'colorless':
-            return True  # All lands can produce colorless mana
+        mask = 0
+        # Lands produce the colors encoded in their mask
+        for land in battlefield.lands:
+            mask |= land.mana_colors_mask
         
-        return False
-    
-    def _artifact_can_produce_mana(self, artifact: CardInfo, color: str) -> bool:
-        """Check if an artifact can produce mana of a specific color."""
-        # Simplified artifact mana production
-        if 'mana' in artifact.name.lower():
-            return True
+        # Simplified artifact mana production: any mana artifact makes any color
+        for artifact in battlefield.artifacts:
+            if artifact.produces_mana:
+                mask = ALL_MANA_COLORS_MASK
+                break
         
-        return False
+        self._gen_cache[player.player_id] = (battlefield, battlefield.revision, mask)
+        return mask
     
     def generate_mana(self, player: PlayerState, color: str, amount: int = 1) -> bool:
         """Generate mana for a player."""
-        try:
-            if not self.can_generate_mana(player, color, amount):
-                return False
-            
-            # Add mana to pool
-            for _ in range(amount):
-                if color == 'white':
-                    player.mana_pool.white += 1
-                elif color == 'blue':
-                    player.mana_pool.blue += 1
-                elif color == 'black':
-                    player.mana_pool.black += 1
-                elif color == 'red':
-                    player.mana_pool.red += 1
-                elif color == 'green':
-                    player.mana_pool.green += 1
-                elif color == 'colorless':
-                    player.mana_pool.colorless += 1
-                else:
-                    return False
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error generating mana: {e}")
+        color = _to_color(color)
+        if color is None or not self._can_generate_color(player, color):
             return False
+        
+        # Add mana to pool
+        attr = _COLOR_ATTRS[color]
+        player.mana_pool.add(attr, amount)
+        return True
     
     def get_mana_pool_summary(self, player: PlayerState) -> Dict[str, Any]:
         """Get a summary of a player's mana pool."""
+        mask = self._get_mana_mask(player)
         return {
             'white': player.mana_pool.white,
             'blue': player.mana_pool.blue,
@@ -587,11 +552,6 @@ class ManaSystem:
             'colorless': player.mana_pool.colorless,
             'total': player.mana_pool.total_mana(),
             'can_generate': {
-                'white': self.can_generate_mana(player, 'white'),
-                'blue': self.can_generate_mana(player, 'blue'),
-                'black': self.can_generate_mana(player, 'black'),
-                'red': self.can_generate_mana(player, 'red'),
-                'green': self.can_generate_mana(player, 'green'),
-                'colorless': self.can_generate_mana(player, 'colorless')
+                name: bool(mask & (1 << color)) for name, color in _NAME_TO_COLOR.items()
             }
         }
@@ -6,10 +6,11 @@ Implements Magic: The Gathering timing rules and priority system.
 Handles when actions can be performed and priority passing.
 """
 
-from typing import List, Dict, Optional, Set, Any
+from typing import List, Dict, Optional, Any, Tuple, Callable
 from datetime import datetime
 from enum import Enum
 import logging
+import weakref
 
 from state.game_state import GameState, GameStatus
 from state.player_state import PlayerState
@@ -18,6 +19,56 @@ from rules.action_types import Action, ActionType, ActionTiming, ActionPriority
 
 logger = logging.getLogger(__name__)
 
+# State changes after which cached timing decisions are dropped
+_CACHE_RESET_CHANGES = frozenset([
+    "game_initialized", "game_started", "game_ended",
+    "phase_changed", "active_player_changed", "turn_advanced",
+])
+
+# Phases in which actions with a restricted timing may be taken
+_TIMING_ALLOWED_PHASES: Dict[ActionTiming, frozenset] = {
+    ActionTiming.MAIN_PHASE: frozenset([Phase.FIRST_MAIN, Phase.SECOND_MAIN]),
+    ActionTiming.COMBAT_PHASE: frozenset([
+        Phase.COMBAT_BEGIN, Phase.DECLARE_ATTACKERS, Phase.DECLARE_BLOCKERS,
+        Phase.COMBAT_DAMAGE, Phase.COMBAT_END,
+    ]),
+    ActionTiming.DECLARE_ATTACKERS: frozenset([Phase.DECLARE_ATTACKERS]),
+    ActionTiming.DECLARE_BLOCKERS: frozenset([Phase.DECLARE_BLOCKERS]),
+    ActionTiming.COMBAT_DAMAGE: frozenset([Phase.COMBAT_DAMAGE]),
+}
+
+# Steps that only allow instant-speed actions
+_INSTANT_SPEED_ACTIONS = frozenset([
+    ActionType.CAST_SPELL, ActionType.ACTIVATE_ABILITY,
+    ActionType.PASS_PRIORITY, ActionType.CONCEDE,
+])
+_STEP_ALLOWED_ACTIONS: Dict[str, frozenset] = {
+    "Upkeep": _INSTANT_SPEED_ACTIONS,
+    "Draw": _INSTANT_SPEED_ACTIONS,
+    "End": _INSTANT_SPEED_ACTIONS,
+}
+
+# Actions only the active player may take
+_ACTIVE_PLAYER_ACTIONS = frozenset([ActionType.PLAY_LAND, ActionType.DECLARE_ATTACKERS])
+
+# Actions that don't require priority
+_NO_PRIORITY_ACTIONS = frozenset([ActionType.CONCEDE, ActionType.MULLIGAN])
+
+# Phase progression within a turn; cleanup ends the turn
+_NEXT_PHASE: Dict[Phase, Phase] = {
+    Phase.UNTAP: Phase.UPKEEP,
+    Phase.UPKEEP: Phase.DRAW,
+    Phase.DRAW: Phase.FIRST_MAIN,
+    Phase.FIRST_MAIN: Phase.COMBAT_BEGIN,
+    Phase.COMBAT_BEGIN: Phase.DECLARE_ATTACKERS,
+    Phase.DECLARE_ATTACKERS: Phase.DECLARE_BLOCKERS,
+    Phase.DECLARE_BLOCKERS: Phase.COMBAT_DAMAGE,
+    Phase.COMBAT_DAMAGE: Phase.COMBAT_END,
+    Phase.COMBAT_END: Phase.SECOND_MAIN,
+    Phase.SECOND_MAIN: Phase.END_STEP,
+    Phase.END_STEP: Phase.CLEANUP,
+}
+
 class PriorityState(str, Enum):
     """Priority states in Magic."""
     ACTIVE_PLAYER = "active_player"
@@ -26,270 +77,250 @@ class PriorityState(str, Enum):
     COMBAT_DAMAGE = "combat_damage"
     TRIGGERED_ABILITY = "triggered_ability"
 
+def _weak_state_callback(rules: 'TimingRules') -> Callable[[str, Dict[str, Any]], None]:
+    """Build a state change callback that does not keep the timing rules alive."""
+    rules_ref = weakref.ref(rules)
+    
+    def callback(change_type: str, data: Dict[str, Any]) -> None:
+        rules = rules_ref()
+        if rules is not None:
+            rules._on_state_change(change_type, data)
+    
+    return callback
+
 class TimingRules:
     """Magic timing rules engine."""
     
     def __init__(self, game_state: GameState):
         self.game_state = game_state
-        self.priority_passed: Set[int] = set()
         self.priority_sequence: List[int] = []
         self.current_priority_player: Optional[int] = None
         self.priority_start_time: Optional[datetime] = None
         
+        # Player IDs in seat order, refreshed when a game is initialized (or on
+        # first use, for players set up some other way)
+        self._player_ids: Tuple[int, ...] = ()
+        self._player_bits: Dict[int, int] = {}
+        self._all_mask: int = 0
+        self._refresh_players()
+        
+        # One bit per player in seat order, set once that player passes priority
+        self._passed_mask: int = 0
+        
+        # Timing decisions keyed by everything they depend on
+        self._legal_cache: Dict[tuple, bool] = {}
+        
+        # Timing validators specialized per action type, built on first use
+        self._validators: Dict[ActionType, Callable[[Action, int], bool]] = {}
+        
+        # Unregistered by close(), or once these rules are garbage collected
+        callback = _weak_state_callback(self)
+        self.game_state.add_state_change_callback(callback)
+        self._unregister = weakref.finalize(self, game_state.remove_state_change_callback, callback)
+    
+    def close(self) -> None:
+        """Stop following state changes of the game state."""
+        self._unregister()
+    
+    def _refresh_players(self) -> None:
+        """Cache the IDs of the players in the game."""
+        self._player_ids = tuple(
+            player.player_id
+            for player in (self.game_state.self_player, self.game_state.opponent_player)
+            if player is not None
+        )
+        self._player_bits = {player_id: 1 << slot for slot, player_id in enumerate(self._player_ids)}
+        self._all_mask = (1 << len(self._player_ids)) - 1
+    
+    def _passed_players(self) -> Tuple[int, ...]:
+        """Get the IDs of players who have passed priority."""
+        mask = self._passed_mask
+        if not mask:
+            return ()
+        return tuple(player_id for player_id in self._player_ids if mask & self._player_bits[player_id])
+    
+    def _on_state_change(self, change_type: str, data: Dict[str, Any]) -> None:
+        """Drop cached timing decisions when the turn structure changes."""
+        if change_type == "game_initialized":
+            self._refresh_players()
+            self._passed_mask = 0
+        if change_type in _CACHE_RESET_CHANGES:
+            self._legal_cache.clear()
+    
     def can_perform_action(self, action: Action, player_id: int) -> bool:
         """Check if an action can be performed at the current time."""
-        try:
-            # Check basic timing
-            if not self._check_basic_timing(action, player_id):
-                return False
-            
-            # Check priority
-            if not self._check_priority(action, player_id):
-                return False
-            
-            # Check phase-specific timing
-            if not self._check_phase_timing(action, player_id):
-                return False
-            
-            # Check step-specific timing
-            if not self._check_step_timing(action, player_id):
-                return False
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error checking timing for action {action.action_type}: {e}")
-            return False
+        key = (action.action_type, action.timing, self._state_key(player_id))
+        result = self._legal_cache.get(key)
+        if result is None:
+            result = self._legal_cache[key] = self._check_action_timing(action, player_id)
+        return result
+    
+    def batch_legal(self, actions: List[Action], player_id: int) -> List[bool]:
+        """Check timing for many actions against the same game state."""
+        state_key = self._state_key(player_id)
+        cache = self._legal_cache
+        results = []
+        for action in actions:
+            key = (action.action_type, action.timing, state_key)
+            result = cache.get(key)
+            if result is None:
+                result = cache[key] = self._check_action_timing(action, player_id)
+            results.append(result)
+        return results
+    
+    def _state_key(self, player_id: int) -> tuple:
+        """Get the part of the game state timing decisions depend on."""
+        game_state = self.game_state
+        player = game_state.get_player(player_id)
+        return (player_id, game_state.status,
+                game_state.current_phase, game_state.current_step,
+                game_state.active_player, game_state.priority_player,
+                self._passed_mask,
+                player is not None and player.is_alive())
+    
+    def _check_action_timing(self, action: Action, player_id: int) -> bool:
+        """Run the timing checks that apply to an action's type."""
+        validator = self._validators.get(action.action_type)
+        if validator is None:
+            validator = self._validators[action.action_type] = self._build_validator(action.action_type)
+        return validator(action, player_id)
+    
+    def _build_validator(self, action_type: ActionType) -> Callable[[Action, int], bool]:
+        """Compose only the timing checks relevant to an action type."""
+        # Cheapest checks first
+        checks: List[Callable[[Action, int], bool]] = []
+        if action_type in _ACTIVE_PLAYER_ACTIONS:
+            checks.append(self._check_active_player)
+        checks.append(self._check_basic_timing)
+        if action_type not in _NO_PRIORITY_ACTIONS:
+            checks.append(self._check_priority)
+        checks.append(self._check_phase_timing)
+        
+        # Steps in which this action type is never allowed
+        restricted_steps = frozenset(
+            step for step, allowed_actions in _STEP_ALLOWED_ACTIONS.items()
+            if action_type not in allowed_actions
+        )
+        if restricted_steps:
+            checks.append(lambda action, player_id: self.game_state.current_step not in restricted_steps)
+        
+        checks = tuple(checks)
+        return lambda action, player_id: all(check(action, player_id) for check in checks)
     
     def _check_basic_timing(self, action: Action, player_id: int) -> bool:
         """Check basic timing requirements."""
+        game_state = self.game_state
+        
         # Check if game is active
-        if not self.game_state.is_game_active():
+        if game_state.status != GameStatus.ACTIVE:
             return False
         
         # Check if player exists and is alive
-        player = self.game_state.get_player(player_id)
-        if not player or not player.is_alive():
-            return False
-        
-        # Check if it's the player's turn (for most actions)
-        if action.action_type in [ActionType.PLAY_LAND, ActionType.DECLARE_ATTACKERS]:
-            if self.game_state.active_player != player_id:
-                return False
-        
-        return True
+        player = game_state.get_player(player_id)
+        return player is not None and player.life_total > 0
+    
+    def _check_active_player(self, action: Action, player_id: int) -> bool:
+        """Check that it's the player's turn."""
+        return self.game_state.active_player == player_id
     
     def _check_priority(self, action: Action, player_id: int) -> bool:
         """Check priority requirements."""
-        # Some actions don't require priority
-        if action.action_type in [ActionType.CONCEDE, ActionType.MULLIGAN]:
-            return True
-        
-        # Check if player has priority
-        if not self._player_has_priority(player_id):
-            return False
-        
-        return True
+        return self._player_has_priority(player_id)
     
     def _check_phase_timing(self, action: Action, player_id: int) -> bool:
         """Check phase-specific timing requirements."""
-        current_phase = self.game_state.current_phase
-        
-        # Main phase actions
-        if action.timing == ActionTiming.MAIN_PHASE:
-            if current_phase not in [Phase.FIRST_MAIN, Phase.SECOND_MAIN]:
-                return False
-        
-        # Combat phase actions
-        elif action.timing == ActionTiming.COMBAT_PHASE:
-            if current_phase not in [Phase.COMBAT_BEGIN, Phase.DECLARE_ATTACKERS, 
-                                       Phase.DECLARE_BLOCKERS, Phase.COMBAT_DAMAGE, Phase.END_COMBAT]:
-                return False
-        
-        # Specific step actions
-        elif action.timing == ActionTiming.DECLARE_ATTACKERS:
-            if current_phase != Phase.DECLARE_ATTACKERS:
-                return False
-        
-        elif action.timing == ActionTiming.DECLARE_BLOCKERS:
-            if current_phase != Phase.DECLARE_BLOCKERS:
-                return False
-        
-        elif action.timing == ActionTiming.COMBAT_DAMAGE:
-            if current_phase != Phase.COMBAT_DAMAGE:
-                return False
-        
-        return True
-    
-    def _check_step_timing(self, action: Action, player_id: int) -> bool:
-        """Check step-specific timing requirements."""
-        current_step = self.game_state.current_step
-        
-        # Upkeep step
-        if current_step == "Upkeep":
-            if action.action_type not in [ActionType.CAST_SPELL, ActionType.ACTIVATE_ABILITY, 
-                                       ActionType.PASS_PRIORITY, ActionType.CONCEDE]:
-                return False
-        
-        # Draw step
-        elif current_step == "Draw":
-            if action.action_type not in [ActionType.CAST_SPELL, ActionType.ACTIVATE_ABILITY, 
-                                        ActionType.PASS_PRIORITY, ActionType.CONCEDE]:
-                return False
-        
-        # End step
-        elif current_step == "End":
-            if action.action_type not in [ActionType.CAST_SPELL, ActionType.ACTIVATE_ABILITY, 
-                                        ActionType.PASS_PRIORITY, ActionType.CONCEDE]:
-                return False
-        
-        return True
+        allowed_phases = _TIMING_ALLOWED_PHASES.get(action.timing)
+        return allowed_phases is None or self.game_state.current_phase in allowed_phases
     
     def _player_has_priority(self, player_id: int) -> bool:
         """Check if a player has priority."""
-        # Check if it's the player's turn
-        if self.game_state.active_player == player_id:
-            return True
-        
-        # Check if it's the non-active player's turn to respond
-        if self.game_state.priority_player == player_id:
-            return True
-        
-        # Check if player has passed priority
-        if player_id in self.priority_passed:
-            return False
-        
-        return True
+        # The active player holds priority until it is passed
+        priority_player = self.game_state.priority_player
+        if priority_player is None:
+            return self.game_state.active_player == player_id
+        return priority_player == player_id
     
     def pass_priority(self, player_id: int) -> bool:
         """Pass priority for a player."""
-        try:
-            # Mark player as having passed priority
-            self.priority_passed.add(player_id)
-            
+        if not self._all_mask:
+            self._refresh_players()
+        
+        # Mark player as having passed priority
+        self._passed_mask |= self._player_bits.get(player_id, 0)
+        
+        with self.game_state.batch_notifications():
             # Check if all players have passed priority
             if self._all_players_passed_priority():
                 self._resolve_priority()
-                return True
-            
-            # Move to next player
-            self._move_to_next_player()
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error passing priority for player {player_id}: {e}")
-            return False
+            else:
+                # Move to next player
+                self._move_to_next_player()
+        return True
     
     def _all_players_passed_priority(self) -> bool:
         """Check if all players have passed priority."""
-        # Get all players
-        players = []
-        if self.game_state.self_player:
-            players.append(self.game_state.self_player.player_id)
-        if self.game_state.opponent_player:
-            players.append(self.game_state.opponent_player.player_id)
-        
-        # Check if all players have passed
-        return all(player_id in self.priority_passed for player_id in players)
+        return self._passed_mask == self._all_mask
     
     def _resolve_priority(self) -> None:
         """Resolve priority and move to next phase/step."""
-        try:
-            # Clear priority passed flags
-            self.priority_passed.clear()
-            
-            # Move to next phase/step
-            self._advance_phase()
-            
-        except Exception as e:
-            logger.error(f"Error resolving priority: {e}")
+        # Clear priority passed flags
+        self._passed_mask = 0
+        
+        # Priority goes back to the active player for the next step
+        self.game_state.priority_player = None
+        self.current_priority_player = None
+        
+        # Move to next phase/step
+        self._advance_phase()
     
     def _move_to_next_player(self) -> None:
         """Move priority to the next player."""
-        try:
-            # Get all players
-            players = []
-            if self.game_state.self_player:
-                players.append(self.game_state.self_player.player_id)
-            if self.game_state.opponent_player:
-                players.append(self.game_state.opponent_player.player_id)
-            
-            # Find current priority player
-            current_player = self.game_state.priority_player
-            if current_player is None:
-                current_player = self.game_state.active_player
-            
-            # Move to next player
-            current_index = players.index(current_player) if current_player in players else 0
-            next_index = (current_index + 1) % len(players)
-            next_player = players[next_index]
-            
-            # Set priority player
-            self.game_state.priority_player = next_player
-            self.current_priority_player = next_player
-            
-        except Exception as e:
-            logger.error(f"Error moving to next player: {e}")
+        players = self._player_ids
+        if not players:
+            return
+        
+        # Find current priority player
+        current_player = self.game_state.priority_player
+        if current_player is None:
+            current_player = self.game_state.active_player
+        
+        # Move to next player
+        current_index = players.index(current_player) if current_player in players else 0
+        next_player = players[(current_index + 1) % len(players)]
+        
+        # Set priority player
+        self.game_state.priority_player = next_player
+        self.current_priority_player = next_player
     
     def _advance_phase(self) -> None:
         """Advance to the next phase."""
-        try:
-            current_phase = self.game_state.current_phase
-            
-            # Phase progression
-            if current_phase == Phase.UNTAP:
-                self.game_state.set_phase(Phase.UPKEEP)
-            elif current_phase == Phase.UPKEEP:
-                self.game_state.set_phase(Phase.DRAW)
-            elif current_phase == Phase.DRAW:
-                self.game_state.set_phase(Phase.FIRST_MAIN)
-            elif current_phase == Phase.FIRST_MAIN:
-                self.game_state.set_phase(Phase.COMBAT_BEGIN)
-            elif current_phase == Phase.COMBAT_BEGIN:
-                self.game_state.set_phase(Phase.DECLARE_ATTACKERS)
-            elif current_phase == Phase.DECLARE_ATTACKERS:
-                self.game_state.set_phase(Phase.DECLARE_BLOCKERS)
-            elif current_phase == Phase.DECLARE_BLOCKERS:
-                self.game_state.set_phase(Phase.COMBAT_DAMAGE)
-            elif current_phase == Phase.COMBAT_DAMAGE:
-                self.game_state.set_phase(Phase.END_COMBAT)
-            elif current_phase == Phase.END_COMBAT:
-                self.game_state.set_phase(Phase.SECOND_MAIN)
-            elif current_phase == Phase.SECOND_MAIN:
-                self.game_state.set_phase(Phase.END_STEP)
-            elif current_phase == Phase.END_STEP:
-                self.game_state.set_phase(Phase.CLEANUP)
-            elif current_phase == Phase.CLEANUP:
-                # End of turn
-                self._end_turn()
-            
-        except Exception as e:
-            logger.error(f"Error advancing phase: {e}")
+        next_phase = _NEXT_PHASE.get(self.game_state.current_phase)
+        if next_phase is not None:
+            self.game_state.set_phase(next_phase)
+        elif self.game_state.current_phase == Phase.CLEANUP:
+            # End of turn
+            self._end_turn()
     
     def _end_turn(self) -> None:
         """End the current turn."""
-        try:
-            # Reset turn flags for all players
-            if self.game_state.self_player:
-                self.game_state.self_player.reset_turn_flags()
-            if self.game_state.opponent_player:
-                self.game_state.opponent_player.reset_turn_flags()
-            
-            # Advance turn
-            self.game_state.next_turn()
-            
-            # Start new turn
-            self.game_state.set_phase(Phase.UNTAP)
-            
-        except Exception as e:
-            logger.error(f"Error ending turn: {e}")
+        # Reset turn flags for all players
+        if self.game_state.self_player:
+            self.game_state.self_player.reset_turn_flags()
+        if self.game_state.opponent_player:
+            self.game_state.opponent_player.reset_turn_flags()
+        
+        # Advance turn
+        self.game_state.next_turn()
+        
+        # Start new turn
+        self.game_state.set_phase(Phase.UNTAP)
     
     def get_priority_info(self) -> Dict[str, Any]:
         """Get information about current priority state."""
         return {
             "active_player": self.game_state.active_player,
             "priority_player": self.game_state.priority_player,
-            "priority_passed": list(self.priority_passed),
+            "priority_passed": self._passed_players(),
             "current_phase": self.game_state.current_phase,
             "current_step": self.game_state.current_step,
             "turn_number": self.game_state.turn_number
@@ -297,49 +328,25 @@ class TimingRules:
     
     def reset_priority(self) -> None:
         """Reset priority state."""
-        self.priority_passed.clear()
+        self._passed_mask = 0
         self.priority_sequence.clear()
         self.current_priority_player = None
         self.priority_start_time = None
     
     def can_respond_to(self, action: Action, responding_player_id: int) -> bool:
         """Check if a player can respond to an action."""
-        try:
-            # Check if player has priority
-            if not self._player_has_priority(responding_player_id):
-                return False
-            
-            # Check if action is on the stack
-            if not self._is_action_on_stack(action):
-                return False
-            
-            # Check if player can respond
-            if not self._can_player_respond(responding_player_id):
-                return False
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error checking if player can respond: {e}")
+        # Check if player has priority
+        if not self._player_has_priority(responding_player_id):
             return False
+        
+        # Check if action is on the stack
+        return self._is_action_on_stack(action)
     
     def _is_action_on_stack(self, action: Action) -> bool:
         """Check if an action is on the stack."""
         # Simplified check - in a real implementation, this would check the actual stack
         return action.action_type in [ActionType.CAST_SPELL, ActionType.ACTIVATE_ABILITY]
     
-    def _can_player_respond(self, player_id: int) -> bool:
-        """Check if a player can respond to something."""
-        # Check if player has priority
-        if not self._player_has_priority(player_id):
-            return False
-        
-        # Check if player has passed priority
-        if player_id in self.priority_passed:
-            return False
-        
-        return True
-    
     def get_legal_responses(self, action: Action, responding_player_id: int) -> List[Action]:
         """Get legal responses to an action."""
         legal_responses = []
@@ -356,7 +363,7 @@ class TimingRules:
             
             # Generate possible responses
             # Counter spells
-            for spell in player.hand.cards:
+            for spell in player.hand.counter_cards:
                 if self._can_counter_spell(spell, action):
                     response = Action(
                         action_type=ActionType.COUNTER_SPELL,
@@ -376,18 +383,10 @@ class TimingRules:
             return legal_responses
             
         except Exception as e:
-            logger.error(f"Error getting legal responses: {e}")
+            logger.error("Error getting legal responses: %s", e)
             return []
     
     def _can_counter_spell(self, spell: CardInfo, target_action: Action) -> bool:
         """Check if a spell can counter another spell."""
         # Simplified counter spell logic
-        if not spell.abilities:
-            return False
-        
-        # Check if spell has counter ability
-        for ability in spell.abilities:
-            if "counter" in ability.lower():
-                return True
-        
-        return False
+        return spell.has_counter
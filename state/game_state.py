@@ -6,14 +6,33 @@ Main game state manager that tracks the overall game state,
 including both players, current phase, and game rules.
 """
 
-from typing import Dict, List, Optional, Set, Callable
-from datetime import datetime
-from pydantic import BaseModel, Field
+from typing import Any, Deque, Dict, Iterator, List, Optional, Set, Tuple, Callable
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pydantic import TypeAdapter
 from enum import Enum
+import itertools
+import logging
+import time
 
-from parser.events import GameEvent, EventType, Phase, ZoneType, CardInfo
+from parser.events import (
+    GameEvent, EventType, Phase, ZoneType, CardType, CardInfo, CARD_TYPE_BITS,
+    GameStartEvent, GameEndEvent, DrawCardEvent, PlayCardEvent,
+    LifeChangeEvent, PhaseChangeEvent, TurnChangeEvent
+)
 from state.player_state import PlayerState, PlayerType, ManaPool
 
+logger = logging.getLogger(__name__)
+
+_LAND_BIT = CARD_TYPE_BITS[CardType.LAND]
+
+# Maximum number of events and state changes kept in memory
+EVENT_HISTORY_LIMIT = 4096
+
+def _bounded_history() -> Deque:
+    return deque(maxlen=EVENT_HISTORY_LIMIT)
+
 class GameStatus(str, Enum):
     """Game status."""
     WAITING = "waiting"
@@ -22,8 +41,14 @@ class GameStatus(str, Enum):
     ENDED = "ended"
     PAUSED = "paused"
 
-class GameState(BaseModel):
-    """Complete game state."""
+@dataclass(slots=True)
+class GameState:
+    """Complete game state.
+    
+    A plain slotted dataclass rather than a pydantic model, since the
+    turn structure fields are reassigned constantly during play. Use
+    to_dict()/from_dict() at serialization boundaries.
+    """
     game_id: Optional[str] = None
     status: GameStatus = GameStatus.WAITING
     turn_number: int = 0
@@ -42,21 +67,60 @@ class GameState(BaseModel):
     mulligan_count: int = 0
     
     # Stack and priority
-    stack: List[CardInfo] = Field(default_factory=list)
+    stack: List[CardInfo] = field(default_factory=list)
     priority_passed: bool = False
     
-    # Game history
-    event_history: List[GameEvent] = Field(default_factory=list)
-    state_changes: List[Dict] = Field(default_factory=list)
+    # Game history (bounded; oldest entries are dropped)
+    event_history: Deque[GameEvent] = field(default_factory=_bounded_history)
+    state_changes: Deque[Dict] = field(default_factory=_bounded_history)
     
     # Callbacks for state changes
-    state_change_callbacks: List[Callable] = Field(default_factory=list)
+    state_change_callbacks: List[Callable] = field(default_factory=list)
+    
+    # Notifications held back while a batch is open
+    _pending_notifications: List[Tuple[str, Dict]] = field(default_factory=list, init=False, repr=False)
+    _batch_depth: int = field(default=0, init=False, repr=False)
+    
+    # Last summary built and the state it was built from
+    _summary_key: Optional[tuple] = field(default=None, init=False, repr=False)
+    _summary_cache: Optional[Dict] = field(default=None, init=False, repr=False)
+    
+    # Bumped on every state-changing notification, so callers can tell real changes apart
+    _revision: int = field(default=0, init=False, repr=False)
+    
+    def __post_init__(self) -> None:
+        # Validation builds unbounded deques; restore the history limit
+        if self.event_history.maxlen != EVENT_HISTORY_LIMIT:
+            self.event_history = deque(self.event_history, maxlen=EVENT_HISTORY_LIMIT)
+        if self.state_changes.maxlen != EVENT_HISTORY_LIMIT:
+            self.state_changes = deque(self.state_changes, maxlen=EVENT_HISTORY_LIMIT)
+    
+    @property
+    def revision(self) -> int:
+        """Get the current state revision."""
+        return self._revision
+    
+    def to_dict(self, mode: str = 'python') -> Dict[str, Any]:
+        """Serialize the game state to plain Python data (callbacks excluded).
+
+        Use mode='json' for data that only holds JSON types (lists, strings, numbers).
+        """
+        return _game_state_adapter().dump_python(self, exclude=_NON_STATE_FIELDS, mode=mode)
+    
+    def to_json(self) -> bytes:
+        """Serialize the game state straight to JSON bytes (callbacks excluded)."""
+        return _game_state_adapter().dump_json(self, exclude=_NON_STATE_FIELDS)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'GameState':
+        """Build a validated game state from plain Python data."""
+        return _game_state_adapter().validate_python(data)
     
     def initialize_game(self, self_player_id: int, opponent_player_id: int, 
                       starting_life: int = 20) -> bool:
         """Initialize a new game."""
         try:
-            self.game_id = f"game_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            self.game_id = f"game_{time.time_ns():x}"
             self.status = GameStatus.STARTING
             self.turn_number = 0
             self.starting_life = starting_life
@@ -83,15 +147,18 @@ class GameState(BaseModel):
             return True
             
         except Exception as e:
-            print(f"Error initializing game: {e}")
+            logger.error("Error initializing game: %s", e)
             return False
     
     def get_player(self, player_id: int) -> Optional[PlayerState]:
         """Get player state by ID."""
-        if self.self_player and self.self_player.player_id == player_id:
-            return self.self_player
-        elif self.opponent_player and self.opponent_player.player_id == player_id:
-            return self.opponent_player
+        # Checked against the current players, which callers may replace at any time
+        self_player = self.self_player
+        if self_player is not None and self_player.player_id == player_id:
+            return self_player
+        opponent_player = self.opponent_player
+        if opponent_player is not None and opponent_player.player_id == player_id:
+            return opponent_player
         return None
     
     def get_self_player(self) -> Optional[PlayerState]:
@@ -104,9 +171,7 @@ class GameState(BaseModel):
     
     def get_active_player(self) -> Optional[PlayerState]:
         """Get currently active player."""
-        if self.active_player is not None:
-            return self.get_player(self.active_player)
-        return None
+        return self.get_player(self.active_player)
     
     def set_active_player(self, player_id: int) -> bool:
         """Set the active player."""
@@ -161,40 +226,31 @@ class GameState(BaseModel):
             # Add to event history
             self.event_history.append(event)
             
-            # Process based on event type
-            if event.event_type == EventType.GAME_START:
-                return self._process_game_start(event)
-            elif event.event_type == EventType.GAME_END:
-                return self._process_game_end(event)
-            elif event.event_type == EventType.DRAW_CARD:
-                return self._process_draw_card(event)
-            elif event.event_type == EventType.PLAY_CARD:
-                return self._process_play_card(event)
-            elif event.event_type == EventType.LIFE_CHANGE:
-                return self._process_life_change(event)
-            elif event.event_type == EventType.PHASE_CHANGE:
-                return self._process_phase_change(event)
-            elif event.event_type == EventType.TURN_CHANGE:
-                return self._process_turn_change(event)
-            else:
-                # Handle other event types
-                self._notify_state_change("event_processed", {
-                    "event_type": event.event_type,
-                    "timestamp": event.timestamp
-                })
-                return True
-                
+            # Process based on event class, notifying once the event is applied
+            handler = _EVENT_HANDLERS.get(type(event))
+            with self.batch_notifications():
+                if handler is None:
+                    return self._process_other_event(event)
+                return handler(self, event)
+            
         except Exception as e:
-            print(f"Error processing event {event.event_type}: {e}")
+            logger.error("Error processing event %s: %s", event.event_type, e)
             return False
     
-    def _process_game_start(self, event: GameEvent) -> bool:
+    def _process_other_event(self, event: GameEvent) -> bool:
+        """Process event types without dedicated state handling."""
+        self._notify_state_change("event_processed", {
+            "event_type": event.event_type,
+            "timestamp": event.timestamp
+        }, mutated=False)
+        return True
+    
+    def _process_game_start(self, event: GameStartEvent) -> bool:
         """Process game start event."""
-        if hasattr(event, 'player_life') and hasattr(event, 'opponent_life'):
-            if self.self_player:
-                self.self_player.life_total = event.player_life
-            if self.opponent_player:
-                self.opponent_player.life_total = event.opponent_life
+        if self.self_player:
+            self.self_player.life_total = event.player_life
+        if self.opponent_player:
+            self.opponent_player.life_total = event.opponent_life
         
         self.status = GameStatus.ACTIVE
         self._notify_state_change("game_started", {
@@ -203,82 +259,82 @@ class GameState(BaseModel):
         })
         return True
     
-    def _process_game_end(self, event: GameEvent) -> bool:
+    def _process_game_end(self, event: GameEndEvent) -> bool:
         """Process game end event."""
         self.status = GameStatus.ENDED
         self._notify_state_change("game_ended", {
             "game_id": self.game_id,
-            "winner": getattr(event, 'winner', None),
-            "reason": getattr(event, 'reason', None)
+            "winner": event.winner,
+            "reason": event.reason
         })
         return True
     
-    def _process_draw_card(self, event: GameEvent) -> bool:
+    def _process_draw_card(self, event: DrawCardEvent) -> bool:
         """Process draw card event."""
-        if hasattr(event, 'player') and hasattr(event, 'card'):
-            player = self.get_player(event.player)
-            if player:
-                player.hand.add_card(event.card)
-                self._notify_state_change("card_drawn", {
+        player = self.get_player(event.player)
+        if player:
+            player.hand.add_card(event.card)
+            self._notify_state_change("card_drawn", {
+                "player_id": event.player,
+                "card_name": event.card.name,
+                "hand_size": player.hand.size()
+            })
+        return True
+    
+    def _process_play_card(self, event: PlayCardEvent) -> bool:
+        """Process play card event."""
+        player = self.get_player(event.player)
+        if player:
+            # Move from hand to battlefield, placing the event's card, which
+            # carries the most recent details
+            if player.move_card(event.card.instance_id, "battlefield", src_zone="hand",
+                                card=event.card):
+                # Handle land play
+                if event.card.card_type_mask & _LAND_BIT:
+                    player.has_played_land_this_turn = True
+                
+                self._notify_state_change("card_played", {
                     "player_id": event.player,
                     "card_name": event.card.name,
+                    "card_types": event.card.card_types,
                     "hand_size": player.hand.size()
                 })
         return True
     
-    def _process_play_card(self, event: GameEvent) -> bool:
-        """Process play card event."""
-        if hasattr(event, 'player') and hasattr(event, 'card'):
-            player = self.get_player(event.player)
-            if player:
-                # Remove from hand
-                removed_card = player.hand.remove_card(event.card.instance_id)
-                if removed_card:
-                    # Add to battlefield
-                    player.battlefield.add_card(event.card)
-                    
-                    # Handle land play
-                    if CardType.LAND in event.card.card_types:
-                        player.has_played_land_this_turn = True
-                    
-                    self._notify_state_change("card_played", {
-                        "player_id": event.player,
-                        "card_name": event.card.name,
-                        "card_types": event.card.card_types,
-                        "hand_size": player.hand.size()
-                    })
-        return True
-    
-    def _process_life_change(self, event: GameEvent) -> bool:
+    def _process_life_change(self, event: LifeChangeEvent) -> bool:
         """Process life change event."""
-        if hasattr(event, 'player') and hasattr(event, 'new_life'):
-            player = self.get_player(event.player)
-            if player:
-                old_life = player.life_total
-                player.life_total = event.new_life
-                
-                self._notify_state_change("life_changed", {
-                    "player_id": event.player,
-                    "old_life": old_life,
-                    "new_life": event.new_life,
-                    "change": event.new_life - old_life
-                })
+        player = self.get_player(event.player)
+        if player:
+            old_life = player.life_total
+            player.life_total = event.new_life
+            
+            self._notify_state_change("life_changed", {
+                "player_id": event.player,
+                "old_life": old_life,
+                "new_life": event.new_life,
+                "change": event.new_life - old_life
+            })
         return True
     
-    def _process_phase_change(self, event: GameEvent) -> bool:
+    def _process_phase_change(self, event: PhaseChangeEvent) -> bool:
         """Process phase change event."""
-        if hasattr(event, 'new_phase'):
-            self.set_phase(event.new_phase, getattr(event, 'new_step', None))
+        self.set_phase(event.new_phase, event.new_step)
         return True
     
-    def _process_turn_change(self, event: GameEvent) -> bool:
+    def _process_turn_change(self, event: TurnChangeEvent) -> bool:
         """Process turn change event."""
-        if hasattr(event, 'new_turn'):
-            self.turn_number = event.new_turn
-            if hasattr(event, 'active_player'):
-                self.set_active_player(event.active_player)
+        self.turn_number = event.new_turn
+        self.set_active_player(event.active_player)
         return True
     
+    def get_event_history(self, limit: Optional[int] = None) -> List[GameEvent]:
+        """Get the most recent events, oldest first."""
+        if limit is None or limit >= len(self.event_history):
+            return list(self.event_history)
+        if limit <= 0:
+            return []
+        return list(itertools.islice(reversed(self.event_history), limit))[::-1]
+    
     def add_state_change_callback(self, callback: Callable) -> bool:
         """Add a callback for state changes."""
         self.state_change_callbacks.append(callback)
@@ -291,16 +347,63 @@ class GameState(BaseModel):
             return True
         return False
     
-    def _notify_state_change(self, change_type: str, data: Dict) -> None:
+    @contextmanager
+    def batch_notifications(self) -> Iterator[None]:
+        """Hold state change notifications until the outermost batch closes."""
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self.flush_notifications()
+    
+    def flush_notifications(self) -> None:
+        """Deliver pending notifications, keeping only the last phase change."""
+        pending = self._pending_notifications
+        if not pending:
+            return
+        self._pending_notifications = []
+        
+        last_phase_change = max(
+            (i for i, (change_type, _) in enumerate(pending) if change_type == "phase_changed"),
+            default=-1
+        )
+        for i, (change_type, data) in enumerate(pending):
+            if change_type == "phase_changed" and i != last_phase_change:
+                continue
+            self._dispatch_state_change(change_type, data)
+    
+    def _notify_state_change(self, change_type: str, data: Dict, mutated: bool = True) -> None:
         """Notify all callbacks of a state change."""
+        if mutated:
+            self._revision += 1
+        if self._batch_depth:
+            self._pending_notifications.append((change_type, data))
+        else:
+            self._dispatch_state_change(change_type, data)
+    
+    def _dispatch_state_change(self, change_type: str, data: Dict) -> None:
+        """Invoke every callback for a single state change."""
         for callback in self.state_change_callbacks:
             try:
                 callback(change_type, data)
             except Exception as e:
-                print(f"Error in state change callback: {e}")
+                logger.error("Error in state change callback: %s", e)
     
     def get_game_summary(self) -> Dict:
-        """Get a summary of the current game state."""
+        """Get a summary of the current game state.
+        
+        Returns a shallow copy of the cached summary; the nested player
+        dicts are shared and must be treated as read-only.
+        """
+        key = (self.game_id, self.status, self.turn_number, self.current_phase,
+               self.current_step, self.active_player,
+               _player_summary_key(self.self_player),
+               _player_summary_key(self.opponent_player))
+        if key == self._summary_key:
+            return dict(self._summary_cache)
+        
         summary = {
             "game_id": self.game_id,
             "status": self.status,
@@ -330,7 +433,9 @@ class GameState(BaseModel):
                 "mana_pool": self.opponent_player.get_mana_summary()
             }
         
-        return summary
+        self._summary_key = key
+        self._summary_cache = summary
+        return dict(summary)
     
     def is_game_active(self) -> bool:
         """Check if game is currently active."""
@@ -352,3 +457,36 @@ class GameState(BaseModel):
             return self.self_player.player_id if self.self_player else None
         
         return None
+
+# Event class -> GameState handler
+_EVENT_HANDLERS: Dict[type, Callable[[GameState, GameEvent], bool]] = {
+    GameStartEvent: GameState._process_game_start,
+    GameEndEvent: GameState._process_game_end,
+    DrawCardEvent: GameState._process_draw_card,
+    PlayCardEvent: GameState._process_play_card,
+    LifeChangeEvent: GameState._process_life_change,
+    PhaseChangeEvent: GameState._process_phase_change,
+    TurnChangeEvent: GameState._process_turn_change,
+}
+
+def _player_summary_key(player: Optional[PlayerState]) -> Optional[tuple]:
+    """Get the player fields a game summary is built from."""
+    if player is None:
+        return None
+    return (id(player), player.life_total, len(player.hand.cards),
+            player.battlefield.revision, player.mana_pool.revision)
+
+# Runtime-only fields left out of serialized state
+_NON_STATE_FIELDS = {
+    "state_change_callbacks", "_pending_notifications", "_batch_depth",
+    "_summary_key", "_summary_cache", "_revision",
+}
+
+_GAME_STATE_ADAPTER: Optional[TypeAdapter] = None
+
+def _game_state_adapter() -> TypeAdapter:
+    """Get the (lazily built) pydantic adapter used to (de)serialize GameState."""
+    global _GAME_STATE_ADAPTER
+    if _GAME_STATE_ADAPTER is None:
+        _GAME_STATE_ADAPTER = TypeAdapter(GameState)
+    return _GAME_STATE_ADAPTER
@@ -6,20 +6,42 @@ Represents the state of a single player in the game.
 Tracks life, hand, battlefield, mana, and other player-specific data.
 """
 
-from typing import List, Dict, Optional, Set
+from typing import Annotated, Iterator, List, Dict, Optional, Set, Tuple
+from dataclasses import dataclass, field
+from itertools import chain
 from datetime import datetime
-from pydantic import BaseModel, Field
+from functools import lru_cache
+from pydantic import Field
 from enum import Enum
 
-from parser.events import CardInfo, ZoneType, CardType
+from parser.events import CardInfo, ZoneType, CardType, CARD_TYPE_BITS
 
 class PlayerType(str, Enum):
     """Player types."""
     SELF = "self"
     OPPONENT = "opponent"
 
-class ManaPool(BaseModel):
+MANA_COLORS = ('white', 'blue', 'black', 'red', 'green', 'colorless')
+
+# Mana symbol -> ManaPool attribute
+_MANA_SYMBOL_ATTRS = dict(zip('wubrgc', MANA_COLORS))
+
+@lru_cache(maxsize=4096)
+def _cost_len(cost: str) -> int:
+    """Get the simplified mana amount of a cost string (symbols minus braces)."""
+    return len(cost) - cost.count('{') - cost.count('}')
+
+# Derived, runtime-only dataclass fields: not constructor arguments, not serialized
+Derived = Field(exclude=True)
+
+@dataclass(slots=True)
+class ManaPool:
     """Player's mana pool."""
+    # Running total, kept in sync by __setattr__ on every color write
+    # (declared first so it exists before the colors are assigned)
+    _total: Annotated[int, Derived] = field(default=0, init=False, repr=False)
+    _rev: Annotated[int, Derived] = field(default=0, init=False, repr=False)
+    
     white: int = 0
     blue: int = 0
     black: int = 0
@@ -27,151 +49,276 @@ class ManaPool(BaseModel):
     green: int = 0
     colorless: int = 0
     
+    def __post_init__(self) -> None:
+        # Validation may fill the colors without going through __setattr__
+        self._total = (self.white + self.blue + self.black + self.red +
+                       self.green + self.colorless)
+    
+    def __setattr__(self, name, value):
+        if name in MANA_COLORS:
+            self._total += value - getattr(self, name, 0)
+            self._rev += 1
+        object.__setattr__(self, name, value)
+    
+    @property
+    def revision(self) -> int:
+        """Get the current mana pool revision."""
+        return self._rev
+    
+    def add(self, color: str, amount: int) -> None:
+        """Add mana of a color (a MANA_COLORS name), keeping the total in step."""
+        object.__setattr__(self, color, getattr(self, color) + amount)
+        object.__setattr__(self, '_total', self._total + amount)
+        object.__setattr__(self, '_rev', self._rev + 1)
+    
+    def spend(self, color: str, amount: int) -> None:
+        """Remove mana of a color (a MANA_COLORS name), keeping the total in step."""
+        self.add(color, -amount)
+    
     def total_mana(self) -> int:
         """Get total mana available."""
-        return self.white + self.blue + self.black + self.red + self.green + self.colorless
+        return self._total
     
     def can_pay_cost(self, cost: str) -> bool:
         """Check if player can pay a mana cost."""
         # Simplified cost checking - would need proper mana cost parsing
-        return self.total_mana() >= len(cost.replace('{', '').replace('}', ''))
+        return self._total >= _cost_len(cost)
     
     def pay_cost(self, cost: str) -> bool:
         """Pay a mana cost (simplified)."""
-        if not self.can_pay_cost(cost):
+        # Simplified cost payment - would need proper mana cost parsing
+        cost_amount = _cost_len(cost)
+        if self._total < cost_amount:
             return False
         
-        # Simplified cost payment - would need proper mana cost parsing
-        cost_amount = len(cost.replace('{', '').replace('}', ''))
         if self.colorless >= cost_amount:
-            self.colorless -= cost_amount
+            self.spend('colorless', cost_amount)
             return True
         return False
 
-class Hand(BaseModel):
+@dataclass(slots=True)
+class Hand:
     """Player's hand."""
-    cards: List[CardInfo] = Field(default_factory=list)
+    cards: List[CardInfo] = field(default_factory=list)
     max_size: int = 7  # Default hand size limit
     
+    # Lookup by instance ID and cards with a counter ability, kept in step with cards
+    _by_id: Annotated[Dict[int, CardInfo], Derived] = field(default_factory=dict, init=False, repr=False)
+    _counter_cards: Annotated[List[CardInfo], Derived] = field(default_factory=list, init=False, repr=False)
+    
+    # Bumped on every mutation so derived data can be cached per revision
+    _rev: Annotated[int, Derived] = field(default=0, init=False, repr=False)
+    
+    def __post_init__(self) -> None:
+        self._by_id = {card.instance_id: card for card in self.cards}
+        self._counter_cards = [card for card in self.cards if card.has_counter]
+    
+    @property
+    def revision(self) -> int:
+        """Get the current hand revision."""
+        return self._rev
+    
+    @property
+    def counter_cards(self) -> List[CardInfo]:
+        """Get cards in hand that can counter something."""
+        return self._counter_cards
+    
     def add_card(self, card: CardInfo) -> bool:
         """Add a card to hand."""
         if len(self.cards) < self.max_size:
+            self._rev += 1
             self.cards.append(card)
+            self._by_id[card.instance_id] = card
+            if card.has_counter:
+                self._counter_cards.append(card)
             return True
         return False
     
     def remove_card(self, instance_id: int) -> Optional[CardInfo]:
         """Remove a card from hand by instance ID."""
-        for i, card in enumerate(self.cards):
-            if card.instance_id == instance_id:
-                return self.cards.pop(i)
-        return None
+        card = self._by_id.pop(instance_id, None)
+        if card is None:
+            return None
+        self.cards.remove(card)
+        self._rev += 1
+        if card.has_counter:
+            self._counter_cards.remove(card)
+        return card
     
     def get_card(self, instance_id: int) -> Optional[CardInfo]:
         """Get a card from hand by instance ID."""
-        for card in self.cards:
-            if card.instance_id == instance_id:
-                return card
-        return None
+        return self._by_id.get(instance_id)
     
     def size(self) -> int:
         """Get current hand size."""
         return len(self.cards)
 
-class Battlefield(BaseModel):
+# Battlefield category for each card type, in placement priority
+# (e.g. an artifact creature is filed with creatures)
+_BATTLEFIELD_CATEGORIES = ('creatures', 'lands', 'artifacts', 'enchantments', 'planeswalkers', 'other')
+_CARD_TYPE_CATEGORY = {
+    CardType.CREATURE: 0,
+    CardType.LAND: 1,
+    CardType.ARTIFACT: 2,
+    CardType.ENCHANTMENT: 3,
+    CardType.PLANESWALKER: 4,
+}
+_OTHER_CATEGORY = 5
+
+# Card type mask -> battlefield category index, precomputed for every combination of types
+_MASK_CATEGORY = tuple(
+    min((index for card_type, index in _CARD_TYPE_CATEGORY.items() if mask & CARD_TYPE_BITS[card_type]),
+        default=_OTHER_CATEGORY)
+    for mask in range(1 << len(CARD_TYPE_BITS))
+)
+
+@dataclass(slots=True)
+class Battlefield:
     """Player's battlefield (cards in play)."""
-    creatures: List[CardInfo] = Field(default_factory=list)
-    lands: List[CardInfo] = Field(default_factory=list)
-    artifacts: List[CardInfo] = Field(default_factory=list)
-    enchantments: List[CardInfo] = Field(default_factory=list)
-    planeswalkers: List[CardInfo] = Field(default_factory=list)
-    other: List[CardInfo] = Field(default_factory=list)
+    creatures: List[CardInfo] = field(default_factory=list)
+    lands: List[CardInfo] = field(default_factory=list)
+    artifacts: List[CardInfo] = field(default_factory=list)
+    enchantments: List[CardInfo] = field(default_factory=list)
+    planeswalkers: List[CardInfo] = field(default_factory=list)
+    other: List[CardInfo] = field(default_factory=list)
+    
+    # Bumped on every mutation so derived data can be cached per revision
+    _rev: Annotated[int, Derived] = field(default=0, init=False, repr=False)
+    
+    # Instance ID -> (category list holding the card, card)
+    _by_id: Annotated[Dict[int, Tuple[List[CardInfo], CardInfo]], Derived] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    
+    # Running power/toughness totals over creatures, kept in step with add/remove
+    _power: Annotated[int, Derived] = field(default=0, init=False, repr=False)
+    _toughness: Annotated[int, Derived] = field(default=0, init=False, repr=False)
+    
+    def __post_init__(self) -> None:
+        self._by_id = {
+            card.instance_id: (category, card)
+            for category in (self.creatures, self.lands, self.artifacts,
+                             self.enchantments, self.planeswalkers, self.other)
+            for card in category
+        }
+        self._power = sum(card.power or 0 for card in self.creatures)
+        self._toughness = sum(card.toughness or 0 for card in self.creatures)
+    
+    @property
+    def revision(self) -> int:
+        """Get the current battlefield revision."""
+        return self._rev
+    
+    @property
+    def total_power(self) -> int:
+        """Get total power of creatures on battlefield."""
+        return self._power
+    
+    @property
+    def total_toughness(self) -> int:
+        """Get total toughness of creatures on battlefield."""
+        return self._toughness
     
     def add_card(self, card: CardInfo) -> bool:
         """Add a card to battlefield."""
-        if CardType.CREATURE in card.card_types:
-            self.creatures.append(card)
-        elif CardType.LAND in card.card_types:
-            self.lands.append(card)
-        elif CardType.ARTIFACT in card.card_types:
-            self.artifacts.append(card)
-        elif CardType.ENCHANTMENT in card.card_types:
-            self.enchantments.append(card)
-        elif CardType.PLANESWALKER in card.card_types:
-            self.planeswalkers.append(card)
-        else:
-            self.other.append(card)
+        self._rev += 1
+        category = getattr(self, _BATTLEFIELD_CATEGORIES[_MASK_CATEGORY[card.card_type_mask]])
+        category.append(card)
+        self._by_id[card.instance_id] = (category, card)
+        if category is self.creatures:
+            self._power += card.power or 0
+            self._toughness += card.toughness or 0
         return True
     
     def remove_card(self, instance_id: int) -> Optional[CardInfo]:
         """Remove a card from battlefield by instance ID."""
-        for category in [self.creatures, self.lands, self.artifacts, 
-                        self.enchantments, self.planeswalkers, self.other]:
-            for i, card in enumerate(category):
-                if card.instance_id == instance_id:
-                    return category.pop(i)
-        return None
+        entry = self._by_id.pop(instance_id, None)
+        if entry is None:
+            return None
+        category, card = entry
+        category.remove(card)
+        if category is self.creatures:
+            self._power -= card.power or 0
+            self._toughness -= card.toughness or 0
+        self._rev += 1
+        return card
     
     def get_card(self, instance_id: int) -> Optional[CardInfo]:
         """Get a card from battlefield by instance ID."""
-        for category in [self.creatures, self.lands, self.artifacts, 
-                        self.enchantments, self.planeswalkers, self.other]:
-            for card in category:
-                if card.instance_id == instance_id:
-                    return card
-        return None
+        entry = self._by_id.get(instance_id)
+        return entry[1] if entry is not None else None
     
     def get_all_cards(self) -> List[CardInfo]:
         """Get all cards on battlefield."""
-        return (self.creatures + self.lands + self.artifacts + 
-                self.enchantments + self.planeswalkers + self.other)
+        return list(self.iter_all_cards())
     
-    def get_creatures(self) -> List[CardInfo]:
-        """Get all creatures on battlefield."""
-        return self.creatures.copy()
+    def iter_all_cards(self) -> Iterator[CardInfo]:
+        """Iterate over all cards on battlefield without copying them."""
+        return chain(self.creatures, self.lands, self.artifacts,
+                     self.enchantments, self.planeswalkers, self.other)
     
-    def get_lands(self) -> List[CardInfo]:
-        """Get all lands on battlefield."""
-        return self.lands.copy()
+    def get_creatures(self) -> Tuple[CardInfo, ...]:
+        """Get all creatures on battlefield as a read-only snapshot."""
+        return tuple(self.creatures)
+    
+    def get_lands(self) -> Tuple[CardInfo, ...]:
+        """Get all lands on battlefield as a read-only snapshot."""
+        return tuple(self.lands)
 
-class Graveyard(BaseModel):
+@dataclass(slots=True)
+class Graveyard:
     """Player's graveyard."""
-    cards: List[CardInfo] = Field(default_factory=list)
+    cards: List[CardInfo] = field(default_factory=list)
+    
+    # Lookup by instance ID, kept in step with cards
+    _by_id: Annotated[Dict[int, CardInfo], Derived] = field(default_factory=dict, init=False, repr=False)
+    
+    # Bumped on every mutation so derived data can be cached per revision
+    _rev: Annotated[int, Derived] = field(default=0, init=False, repr=False)
+    
+    def __post_init__(self) -> None:
+        self._by_id = {card.instance_id: card for card in self.cards}
+    
+    @property
+    def revision(self) -> int:
+        """Get the current graveyard revision."""
+        return self._rev
     
     def add_card(self, card: CardInfo) -> bool:
         """Add a card to graveyard."""
+        self._rev += 1
         self.cards.append(card)
+        self._by_id[card.instance_id] = card
         return True
     
     def remove_card(self, instance_id: int) -> Optional[CardInfo]:
         """Remove a card from graveyard by instance ID."""
-        for i, card in enumerate(self.cards):
-            if card.instance_id == instance_id:
-                return self.cards.pop(i)
-        return None
+        card = self._by_id.pop(instance_id, None)
+        if card is not None:
+            self.cards.remove(card)
+            self._rev += 1
+        return card
     
     def get_card(self, instance_id: int) -> Optional[CardInfo]:
         """Get a card from graveyard by instance ID."""
-        for card in self.cards:
-            if card.instance_id == instance_id:
-                return card
-        return None
+        return self._by_id.get(instance_id)
 
-class PlayerState(BaseModel):
+@dataclass(slots=True)
+class PlayerState:
     """Complete state of a single player."""
     player_id: int
     player_type: PlayerType
     life_total: int = 20
     max_hand_size: int = 7
-    hand: Hand = Field(default_factory=Hand)
-    battlefield: Battlefield = Field(default_factory=Battlefield)
-    graveyard: Graveyard = Field(default_factory=Graveyard)
-    mana_pool: ManaPool = Field(default_factory=ManaPool)
+    hand: Hand = field(default_factory=Hand)
+    battlefield: Battlefield = field(default_factory=Battlefield)
+    graveyard: Graveyard = field(default_factory=Graveyard)
+    mana_pool: ManaPool = field(default_factory=ManaPool)
     
     # Game state tracking
     has_played_land_this_turn: bool = False
     has_attacked_this_turn: bool = False
-    has_used_ability_this_turn: Set[str] = Field(default_factory=set)
+    has_used_ability_this_turn: Set[str] = field(default_factory=set)
     
     # Counters and effects
     poison_counters: int = 0
@@ -199,6 +346,30 @@ class PlayerState(BaseModel):
         self.has_used_ability_this_turn.add(ability_name)
         return True
     
+    def move_card(self, instance_id: int, dst_zone: str, src_zone: Optional[str] = None,
+                  card: Optional[CardInfo] = None) -> bool:
+        """Move a card between zones ('hand', 'battlefield', 'graveyard'), placing card instead if given."""
+        destination = getattr(self, dst_zone)
+        
+        # Find the card, in the given zone or any zone
+        if src_zone is not None:
+            source = getattr(self, src_zone)
+            found = source.get_card(instance_id)
+        else:
+            for source in (self.hand, self.battlefield, self.graveyard):
+                found = source.get_card(instance_id)
+                if found is not None:
+                    break
+        if found is None or source is destination:
+            return False
+        
+        # Leave the card where it is if the destination can't take it
+        if destination is self.hand and len(self.hand.cards) >= self.hand.max_size:
+            return False
+        
+        source.remove_card(instance_id)
+        return destination.add_card(card if card is not None else found)
+    
     def reset_turn_flags(self):
         """Reset turn-specific flags."""
         self.has_played_land_this_turn = False
@@ -207,19 +378,11 @@ class PlayerState(BaseModel):
     
     def get_total_power(self) -> int:
         """Get total power of all creatures on battlefield."""
-        total = 0
-        for creature in self.battlefield.creatures:
-            if creature.power is not None:
-                total += creature.power
-        return total
+        return self.battlefield.total_power
     
     def get_total_toughness(self) -> int:
         """Get total toughness of all creatures on battlefield."""
-        total = 0
-        for creature in self.battlefield.creatures:
-            if creature.toughness is not None:
-                total += creature.toughness
-        return total
+        return self.battlefield.total_toughness
     
     def get_creature_count(self) -> int:
         """Get number of creatures on battlefield."""
@@ -252,20 +415,10 @@ class PlayerState(BaseModel):
     
     def add_mana(self, color: str, amount: int = 1) -> bool:
         """Add mana to mana pool."""
-        if color.lower() == 'w':
-            self.mana_pool.white += amount
-        elif color.lower() == 'u':
-            self.mana_pool.blue += amount
-        elif color.lower() == 'b':
-            self.mana_pool.black += amount
-        elif color.lower() == 'r':
-            self.mana_pool.red += amount
-        elif color.lower() == 'g':
-            self.mana_pool.green += amount
-        elif color.lower() == 'c':
-            self.mana_pool.colorless += amount
-        else:
+        attr = _MANA_SYMBOL_ATTRS.get(color.lower())
+        if attr is None:
             return False
+        self.mana_pool.add(attr, amount)
         return True
     
     def get_mana_summary(self) -> Dict[str, int]:
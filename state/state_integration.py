@@ -18,14 +18,34 @@ from state.game_state import GameState, GameStatus
 
 logger = logging.getLogger(__name__)
 
+# Minimum delay between state update broadcasts, in seconds
+BROADCAST_INTERVAL = 0.020
+
 class StateIntegration:
     """Integration layer between parser and state manager."""
     
-    def __init__(self, websocket_port: int = 8765):
-        self.state_manager = StateManager()
+    def __init__(self, websocket_port: int = 8765, persistence_file: Optional[str] = None):
+        self.state_manager = StateManager(persistence_file)
         self.event_bus = EventBusManager(port=websocket_port)
         self.is_running = False
-        self.state_callbacks: list = []
+        # Registered callbacks, as an insertion-ordered set
+        self.state_callbacks: Dict[Callable, None] = {}
+        
+        # State change type -> handler
+        self._change_handlers: Dict[str, Callable[[Dict[str, Any]], None]] = {
+            "game_started": self._on_game_started,
+            "game_ended": self._on_game_ended,
+            "card_played": self._on_card_played,
+            "life_changed": self._on_life_changed,
+            "phase_changed": self._on_phase_changed,
+        }
+        
+        # Summary sent with the last state update; an equal summary needs no update
+        self._last_broadcast_summary: Optional[Dict[str, Any]] = None
+        
+        # Set when state changed since the last broadcast; drained by the flusher task
+        self._dirty = asyncio.Event()
+        self._flusher_task: Optional[asyncio.Task] = None
         
         # Set up state change callback
         self.state_manager.add_state_change_callback(self._on_state_change)
@@ -43,6 +63,7 @@ class StateIntegration:
             logger.info("State integration started")
             
             self.is_running = True
+            self._flusher_task = asyncio.create_task(self._flush_loop())
             return True
             
         except Exception as e:
@@ -54,9 +75,24 @@ class StateIntegration:
         try:
             self.is_running = False
             
+            # Stop the flusher and send any pending update
+            if self._flusher_task is not None:
+                self._flusher_task.cancel()
+                try:
+                    await self._flusher_task
+                except asyncio.CancelledError:
+                    pass
+                self._flusher_task = None
+            if self._dirty.is_set():
+                self._dirty.clear()
+                await self._broadcast_state_update()
+            
             # Stop event bus
             await self.event_bus.stop()
             
+            # Write any pending persisted state
+            self.state_manager.shutdown()
+            
             logger.info("State integration stopped")
             
         except Exception as e:
@@ -68,29 +104,25 @@ class StateIntegration:
             logger.warning("State integration not running")
             return False
         
-        try:
-            # Process event in state manager
-            success = self.state_manager.process_event(event)
-            
-            if success:
-                # Broadcast state update via WebSocket
-                await self._broadcast_state_update()
-                
-                # Log the event
-                logger.debug(f"Processed event: {event.event_type}")
-            
-            return success
+        # Process event in state manager (which guards against processing errors)
+        success = self.state_manager.process_event(event)
+        
+        if success:
+            # Schedule a state update broadcast via WebSocket
+            self._dirty.set()
             
-        except Exception as e:
-            logger.error(f"Error processing event {event.event_type}: {e}")
-            return False
+            # Log the event
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Processed event: %s", event.event_type)
+        
+        return success
     
     def get_current_state(self) -> GameState:
         """Get the current game state."""
         return self.state_manager.get_current_state()
     
     def get_game_summary(self) -> Dict[str, Any]:
-        """Get a summary of the current game state."""
+        """Get a summary of the current game state (nested player dicts are read-only)."""
         return self.state_manager.get_game_summary()
     
     def is_game_active(self) -> bool:
@@ -99,83 +131,88 @@ class StateIntegration:
     
     def add_state_callback(self, callback: Callable) -> bool:
         """Add a callback for state changes."""
-        self.state_callbacks.append(callback)
+        self.state_callbacks[callback] = None
         return True
     
     def remove_state_callback(self, callback: Callable) -> bool:
         """Remove a state callback."""
         if callback in self.state_callbacks:
-            self.state_callbacks.remove(callback)
+            del self.state_callbacks[callback]
             return True
         return False
     
     def _on_state_change(self, change_type: str, data: Dict[str, Any]) -> None:
         """Handle state changes."""
-        try:
-            # Log state change
-            logger.debug(f"State change: {change_type}")
-            
-            # Notify callbacks
-            for callback in self.state_callbacks:
-                try:
-                    callback(change_type, data)
-                except Exception as e:
-                    logger.error(f"Error in state callback: {e}")
-            
-            # Handle specific state changes
-            if change_type == "game_started":
-                self._on_game_started(data)
-            elif change_type == "game_ended":
-                self._on_game_ended(data)
-            elif change_type == "card_played":
-                self._on_card_played(data)
-            elif change_type == "life_changed":
-                self._on_life_changed(data)
-            elif change_type == "phase_changed":
-                self._on_phase_changed(data)
-                
-        except Exception as e:
-            logger.error(f"Error handling state change: {e}")
+        # Log state change
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("State change: %s", change_type)
+        
+        # Notify callbacks (a snapshot, so callbacks may unregister themselves); a
+        # failing callback must not keep the others from running
+        for callback in tuple(self.state_callbacks):
+            try:
+                callback(change_type, data)
+            except Exception as e:
+                logger.error("Error in state callback: %s", e)
+        
+        # Handle specific state changes
+        handler = self._change_handlers.get(change_type)
+        if handler is not None:
+            handler(data)
     
     def _on_game_started(self, data: Dict[str, Any]) -> None:
         """Handle game started event."""
-        logger.info(f"Game started: {data.get('game_id', 'unknown')}")
+        logger.info("Game started: %s", data.get('game_id', 'unknown'))
     
     def _on_game_ended(self, data: Dict[str, Any]) -> None:
         """Handle game ended event."""
         winner = data.get('winner')
         reason = data.get('reason', 'unknown')
-        logger.info(f"Game ended - Winner: {winner}, Reason: {reason}")
+        logger.info("Game ended - Winner: %s, Reason: %s", winner, reason)
     
     def _on_card_played(self, data: Dict[str, Any]) -> None:
         """Handle card played event."""
         player_id = data.get('player_id')
         card_name = data.get('card_name', 'unknown')
-        logger.info(f"Player {player_id} played {card_name}")
+        logger.info("Player %s played %s", player_id, card_name)
     
     def _on_life_changed(self, data: Dict[str, Any]) -> None:
         """Handle life change event."""
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        
         player_id = data.get('player_id')
         old_life = data.get('old_life')
         new_life = data.get('new_life')
         change = data.get('change', 0)
         
         if change > 0:
-            logger.info(f"Player {player_id} gained {change} life ({old_life} -> {new_life})")
+            logger.info("Player %s gained %s life (%s -> %s)", player_id, change, old_life, new_life)
         elif change < 0:
-            logger.info(f"Player {player_id} lost {abs(change)} life ({old_life} -> {new_life})")
+            logger.info("Player %s lost %s life (%s -> %s)", player_id, -change, old_life, new_life)
     
     def _on_phase_changed(self, data: Dict[str, Any]) -> None:
         """Handle phase change event."""
         old_phase = data.get('old_phase')
         new_phase = data.get('new_phase')
-        logger.info(f"Phase changed: {old_phase} -> {new_phase}")
+        logger.info("Phase changed: %s -> %s", old_phase, new_phase)
+    
+    async def _flush_loop(self) -> None:
+        """Broadcast at most one state update per interval while state keeps changing."""
+        while True:
+            await self._dirty.wait()
+            await asyncio.sleep(BROADCAST_INTERVAL)
+            self._dirty.clear()
+            await self._broadcast_state_update()
     
     async def _broadcast_state_update(self) -> None:
         """Broadcast current state via WebSocket."""
         try:
             # Get current state summary
             state_summary = self.get_game_summary()
+            if state_summary == self._last_broadcast_summary:
+                return
+            self._last_broadcast_summary = state_summary
             
             # Create state update event
             state_event = {
@@ -190,9 +227,9 @@ class StateIntegration:
         except Exception as e:
             logger.error(f"Error broadcasting state update: {e}")
     
-    def get_state_statistics(self) -> Dict[str, Any]:
-        """Get statistics about the current state."""
-        return self.state_manager.get_state_statistics()
+    def get_state_statistics(self, include_validation: bool = False) -> Dict[str, Any]:
+        """Get statistics about the current state (nested player dicts are read-only)."""
+        return self.state_manager.get_state_statistics(include_validation)
     
     def validate_state(self) -> list:
         """Validate the current game state."""
@@ -256,9 +293,9 @@ class StateIntegrationManager:
         """Remove a state callback."""
         return self.integration.remove_state_callback(callback)
     
-    def get_state_statistics(self) -> Dict[str, Any]:
+    def get_state_statistics(self, include_validation: bool = False) -> Dict[str, Any]:
         """Get state statistics."""
-        return self.integration.get_state_statistics()
+        return self.integration.get_state_statistics(include_validation)
     
     def validate_state(self) -> list:
         """Validate the current state."""
@@ -6,27 +6,165 @@ Main state manager that coordinates between the parser and game state.
 Handles state persistence, validation, and recovery.
 """
 
-import json
 import logging
-from typing import Dict, List, Optional, Callable, Any
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Callable, Any
 from datetime import datetime
 from pathlib import Path
 
-from parser.events import GameEvent, EventType
+import orjson
+from pydantic import TypeAdapter
+from typing_extensions import NotRequired, TypedDict
+
+from parser.events import GameEvent, EventType, CardInfo, EVENT_CLASSES, UnknownEvent
 from state.game_state import GameState, GameStatus
 from state.player_state import PlayerState, PlayerType
 
 logger = logging.getLogger(__name__)
 
+# Seconds to let further events coalesce before writing persisted state
+PERSIST_INTERVAL = 0.100
+
+# Every status a game may legitimately be in
+_VALID_STATUSES = frozenset(GameStatus)
+
+# Logged events between full snapshots; events in between are replayed from the log
+SNAPSHOT_EVENTS = 256
+
+# Flags for opening the temporary persistence file and the event log (O_BINARY only exists on Windows)
+_PERSIST_OPEN_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+_EVENT_LOG_OPEN_FLAGS = os.O_RDWR | os.O_CREAT | os.O_APPEND | getattr(os, 'O_BINARY', 0)
+
+class _PersistedState(TypedDict):
+    """Layout of the persistence file."""
+    timestamp: str
+    version: str
+    event_seq: NotRequired[int]
+    game_state: NotRequired[GameState]
+
+_PERSISTED_STATE_ADAPTER: Optional[TypeAdapter] = None
+
+def _persisted_state_adapter() -> TypeAdapter:
+    """Get the (lazily built) adapter that parses and validates the persistence file in one pass."""
+    global _PERSISTED_STATE_ADAPTER
+    if _PERSISTED_STATE_ADAPTER is None:
+        _PERSISTED_STATE_ADAPTER = TypeAdapter(_PersistedState)
+    return _PERSISTED_STATE_ADAPTER
+
+def _read_envelope_header(data: bytes) -> Optional[Dict[str, Any]]:
+    """Parse just the envelope fields written ahead of the game state, if laid out that way."""
+    end = data.find(b',"game_state":')
+    if end < 0:
+        return None
+    return orjson.loads(data[:end] + b'}')
+
+def _write_chunks(fd: int, chunks: List[bytes]) -> None:
+    """Write all chunks to a file descriptor, in a single writev call where supported."""
+    if hasattr(os, 'writev'):
+        written = os.writev(fd, chunks)
+        if written == sum(map(len, chunks)):
+            return
+        data = memoryview(b''.join(chunks))[written:]
+    else:
+        data = memoryview(b''.join(chunks))
+    while data:
+        data = data[os.write(fd, data):]
+
+def _player_validation_key(player: Optional[PlayerState]) -> Optional[tuple]:
+    """Key of the player fields validation depends on."""
+    if player is None:
+        return None
+    return (id(player), player.life_total, player.max_hand_size, player.hand.revision,
+            player.battlefield.revision, player.graveyard.revision)
+
+def _player_statistics_key(player: Optional[PlayerState]) -> Optional[tuple]:
+    """Key of the player fields the statistics depend on."""
+    if player is None:
+        return None
+    return (id(player), player.life_total, player.hand.revision,
+            player.battlefield.revision, player.mana_pool.revision)
+
+def _player_statistics(player: PlayerState) -> Dict[str, Any]:
+    """Build the statistics reported for one player."""
+    return {
+        "life_total": player.life_total,
+        "hand_size": player.hand.size(),
+        "creature_count": player.get_creature_count(),
+        "land_count": player.get_land_count(),
+        "mana_pool": player.get_mana_summary()
+    }
+
+def _has_duplicate_cards(cards: Iterable[CardInfo]) -> bool:
+    """Check whether any instance ID appears twice, stopping at the first repeat."""
+    seen = set()
+    for card in cards:
+        instance_id = card.instance_id
+        if instance_id in seen:
+            return True
+        seen.add(instance_id)
+    return False
+
 class StateManager:
     """Main state manager for the MTGA Coach."""
     
+    __slots__ = (
+        "game_state", "persistence_file", "state_change_callbacks", "is_initialized",
+        "_change_handlers", "_state_lock", "_persist_lock", "_persist_path", "_persist_tmp",
+        "_persist_cv", "_persist_pending", "_persist_stop", "_persist_thread",
+        "_validation_key", "_validation_errors", "_persisted_revision",
+        "_log_path", "_log_fd", "_event_seq", "_snapshot_seq",
+        "_stats_key", "_stats_cache", "_applying_event",
+    )
+    
     def __init__(self, persistence_file: Optional[str] = None):
         self.game_state = GameState()
         self.persistence_file = persistence_file or "data/game_state.json"
-        self.state_change_callbacks: List[Callable] = []
+        self._persist_path = Path(self.persistence_file)
+        self._persist_tmp = self._persist_path.with_name(self._persist_path.name + ".tmp")
+        
+        # Append-only log of events applied since the last snapshot
+        self._log_path = self._persist_path.with_suffix(".events.jsonl")
+        self._log_fd: Optional[int] = None
+        # Sequence number of the last logged event, and of the last one covered by a snapshot
+        self._event_seq = 0
+        self._snapshot_seq = 0
+        # Set while an event is applied; state changes outside events are not logged
+        self._applying_event = False
+        # Registered callbacks, as an insertion-ordered set
+        self.state_change_callbacks: Dict[Callable, None] = {}
         self.is_initialized = False
         
+        # State change type -> handler
+        self._change_handlers: Dict[str, Callable[[Dict[str, Any]], None]] = {
+            "game_started": self._on_game_started,
+            "game_ended": self._on_game_ended,
+            "card_played": self._on_card_played,
+            "life_changed": self._on_life_changed,
+            "phase_changed": self._on_phase_changed,
+        }
+        
+        # Guards the game state against snapshots taken by the writer thread
+        self._state_lock = threading.RLock()
+        # Serializes writes to the persistence file
+        self._persist_lock = threading.Lock()
+        
+        # Debounced persistence: events mark state pending, the writer thread drains it
+        self._persist_cv = threading.Condition()
+        self._persist_pending = False
+        self._persist_stop = threading.Event()
+        self._persist_thread: Optional[threading.Thread] = None
+        # Last validation result and the state it was computed from
+        self._validation_key: Optional[tuple] = None
+        self._validation_errors: List[str] = []
+        
+        # Last statistics built and the state they were built from
+        self._stats_key: Optional[tuple] = None
+        self._stats_cache: Optional[Dict[str, Any]] = None
+        
+        # Game state revision last written to disk
+        self._persisted_revision = self.game_state.revision
+        
         # Set up state change callback
         self.game_state.add_state_change_callback(self._handle_state_change)
     
@@ -34,11 +172,33 @@ class StateManager:
         """Initialize the state manager."""
         try:
             # Load persisted state if available
-            if self._load_persisted_state():
+            loaded = self._load_persisted_state()
+            if loaded:
+                self._persisted_revision = self.game_state.revision
                 logger.info("Loaded persisted game state")
             else:
                 logger.info("Starting with fresh game state")
             
+            # Create the persistence directory once, rather than on every write
+            self._persist_path.parent.mkdir(parents=True, exist_ok=True)
+            
+            # A log whose snapshot could not be loaded cannot be replayed; drop it and
+            # set the snapshot aside, so neither outlives the new game's events
+            if not loaded and self._persist_path.exists():
+                os.replace(self._persist_path, self._persist_path.with_name(self._persist_path.name + ".bad"))
+                if self._log_path.exists():
+                    self._log_path.unlink()
+                logger.warning("Set aside persisted state that could not be loaded")
+            
+            # Catch up on events logged after the snapshot
+            replayed = self._replay_event_log()
+            if replayed:
+                logger.info("Replayed %d logged events", replayed)
+            # Reopen an existing log for compaction; a new one is created on the first append
+            if self._log_path.exists():
+                self._log_fd = os.open(self._log_path, _EVENT_LOG_OPEN_FLAGS, 0o644)
+            
+            self._start_persist_writer()
             self.is_initialized = True
             return True
             
@@ -54,14 +214,23 @@ class StateManager:
         
         try:
             # Process the event
-            success = self.game_state.process_event(event)
+            with self._state_lock:
+                self._applying_event = True
+                try:
+                    success = self.game_state.process_event(event)
+                finally:
+                    self._applying_event = False
+                if success:
+                    self._append_event(event)
             
             if success:
-                # Persist state if needed
-                self._persist_state()
+                # Events are durable in the log; take a full snapshot only now and then
+                if self._event_seq - self._snapshot_seq >= SNAPSHOT_EVENTS:
+                    self._mark_persist_pending()
                 
                 # Log state change
-                logger.debug(f"Processed event: {event.event_type}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Processed event: %s", event.event_type)
             
             return success
             
@@ -69,6 +238,29 @@ class StateManager:
             logger.error(f"Error processing event {event.event_type}: {e}")
             return False
     
+    def flush(self) -> bool:
+        """Write any pending state to disk now."""
+        with self._persist_cv:
+            if not self._persist_pending:
+                return True
+            self._persist_pending = False
+        return self._persist_state()
+    
+    def shutdown(self) -> None:
+        """Stop the persistence writer and snapshot any logged events."""
+        self._persist_stop.set()
+        with self._persist_cv:
+            self._persist_cv.notify()
+        if self._persist_thread is not None:
+            self._persist_thread.join()
+            self._persist_thread = None
+        if self._event_seq != self._snapshot_seq:
+            self._persist_pending = True
+        self.flush()
+        if self._log_fd is not None:
+            os.close(self._log_fd)
+            self._log_fd = None
+    
     def get_current_state(self) -> GameState:
         """Get the current game state."""
         return self.game_state
@@ -95,94 +287,139 @@ class StateManager:
     
     def add_state_change_callback(self, callback: Callable) -> bool:
         """Add a callback for state changes."""
-        self.state_change_callbacks.append(callback)
+        self.state_change_callbacks[callback] = None
         return True
     
     def remove_state_change_callback(self, callback: Callable) -> bool:
         """Remove a state change callback."""
         if callback in self.state_change_callbacks:
-            self.state_change_callbacks.remove(callback)
+            del self.state_change_callbacks[callback]
             return True
         return False
     
     def _handle_state_change(self, change_type: str, data: Dict[str, Any]) -> None:
         """Handle state changes from the game state."""
         try:
+            # Changes made outside an event never reach the event log; snapshot them
+            if not self._applying_event and self.is_initialized:
+                self._mark_persist_pending()
+            
             # Log state change
-            logger.debug(f"State change: {change_type} - {data}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("State change: %s - %s", change_type, data)
             
-            # Notify callbacks
-            for callback in self.state_change_callbacks:
+            # Notify callbacks; a failing callback must not keep the others from running
+            # A snapshot, so callbacks may unregister themselves
+            for callback in tuple(self.state_change_callbacks):
                 try:
                     callback(change_type, data)
                 except Exception as e:
-                    logger.error(f"Error in state change callback: {e}")
+                    logger.error("Error in state change callback: %s", e)
             
             # Handle specific state changes
-            if change_type == "game_started":
-                self._on_game_started(data)
-            elif change_type == "game_ended":
-                self._on_game_ended(data)
-            elif change_type == "card_played":
-                self._on_card_played(data)
-            elif change_type == "life_changed":
-                self._on_life_changed(data)
-            elif change_type == "phase_changed":
-                self._on_phase_changed(data)
+            handler = self._change_handlers.get(change_type)
+            if handler is not None:
+                handler(data)
                 
         except Exception as e:
             logger.error(f"Error handling state change: {e}")
     
     def _on_game_started(self, data: Dict[str, Any]) -> None:
         """Handle game started event."""
-        logger.info(f"Game started: {data.get('game_id', 'unknown')}")
+        logger.info("Game started: %s", data.get('game_id', 'unknown'))
     
     def _on_game_ended(self, data: Dict[str, Any]) -> None:
         """Handle game ended event."""
         winner = data.get('winner')
         reason = data.get('reason', 'unknown')
-        logger.info(f"Game ended - Winner: {winner}, Reason: {reason}")
+        logger.info("Game ended - Winner: %s, Reason: %s", winner, reason)
     
     def _on_card_played(self, data: Dict[str, Any]) -> None:
         """Handle card played event."""
         player_id = data.get('player_id')
         card_name = data.get('card_name', 'unknown')
-        logger.info(f"Player {player_id} played {card_name}")
+        logger.info("Player %s played %s", player_id, card_name)
     
     def _on_life_changed(self, data: Dict[str, Any]) -> None:
         """Handle life change event."""
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        
         player_id = data.get('player_id')
         old_life = data.get('old_life')
         new_life = data.get('new_life')
         change = data.get('change', 0)
         
         if change > 0:
-            logger.info(f"Player {player_id} gained {change} life ({old_life} -> {new_life})")
+            logger.info("Player %s gained %s life (%s -> %s)", player_id, change, old_life, new_life)
         elif change < 0:
-            logger.info(f"Player {player_id} lost {abs(change)} life ({old_life} -> {new_life})")
+            logger.info("Player %s lost %s life (%s -> %s)", player_id, -change, old_life, new_life)
     
     def _on_phase_changed(self, data: Dict[str, Any]) -> None:
         """Handle phase change event."""
         old_phase = data.get('old_phase')
         new_phase = data.get('new_phase')
-        logger.info(f"Phase changed: {old_phase} -> {new_phase}")
+        logger.info("Phase changed: %s -> %s", old_phase, new_phase)
+    
+    def _start_persist_writer(self) -> None:
+        """Start the background persistence writer if it is not running."""
+        if self._persist_thread is not None:
+            return
+        self._persist_stop.clear()
+        self._persist_thread = threading.Thread(
+            target=self._persist_loop, name="state-persist", daemon=True
+        )
+        self._persist_thread.start()
+    
+    def _mark_persist_pending(self) -> None:
+        """Mark the state as needing a write and wake the writer."""
+        with self._persist_cv:
+            self._persist_pending = True
+            self._persist_cv.notify()
+    
+    def _persist_loop(self) -> None:
+        """Write the state at most once per interval while events keep arriving."""
+        while not self._persist_stop.is_set():
+            with self._persist_cv:
+                while not self._persist_pending and not self._persist_stop.is_set():
+                    self._persist_cv.wait()
+            # Let further events coalesce into this write
+            self._persist_stop.wait(PERSIST_INTERVAL)
+            self.flush()
     
     def _persist_state(self) -> bool:
         """Persist the current game state to file."""
         try:
-            # Ensure directory exists
-            Path(self.persistence_file).parent.mkdir(parents=True, exist_ok=True)
-            
-            # Create persistence data
-            persistence_data = {
-                "timestamp": datetime.now().isoformat(),
-                "game_state": self.game_state.dict(),
-                "version": "1.0.0"
-            }
-            
-            # Write to file
-            with open(self.persistence_file, 'w', encoding='utf-8') as f:
-                json.dump(persistence_data, f, indent=2, default=str)
+            with self._persist_lock:
+                # Serialize the state straight to JSON, without an intermediate dict tree
+                with self._state_lock:
+                    revision = self.game_state.revision
+                    # Logged events are only dropped once a snapshot records them, even
+                    # events that left the revision alone
+                    if revision == self._persisted_revision and self._event_seq == self._snapshot_seq:
+                        return True
+                    state_json = self.game_state.to_json()
+                    event_seq = self._event_seq
+                
+                # Splice the state into the persistence envelope
+                envelope = orjson.dumps({
+                    "timestamp": datetime.now().isoformat(),
+                    "version": "1.0.0",
+                    "event_seq": event_seq
+                })
+                chunks = [envelope[:-1], b',"game_state":', state_json, b'}']
+                
+                # Write to a temporary file and swap it in, so a crash never leaves a torn file
+                fd = os.open(self._persist_tmp, _PERSIST_OPEN_FLAGS, 0o644)
+                try:
+                    _write_chunks(fd, chunks)
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+                os.replace(self._persist_tmp, self._persist_path)
+                self._persisted_revision = revision
+                self._snapshot_seq = event_seq
+                self._compact_event_log()
             
             return True
             
@@ -190,24 +427,105 @@ class StateManager:
             logger.error(f"Failed to persist state: {e}")
             return False
     
+    def _append_event(self, event: GameEvent) -> None:
+        """Append an applied event to the event log (caller holds the state lock)."""
+        try:
+            if self._log_fd is None:
+                self._log_fd = os.open(self._log_path, _EVENT_LOG_OPEN_FLAGS, 0o644)
+            self._event_seq += 1
+            os.write(self._log_fd, b'{"seq":%d,"event":%s}\n' % (
+                self._event_seq, event.model_dump_json().encode()))
+        except Exception as e:
+            logger.error("Failed to append event to log: %s", e)
+    
+    def _compact_event_log(self) -> None:
+        """Drop logged events covered by the latest snapshot."""
+        with self._state_lock:
+            if self._log_fd is None:
+                return
+            if self._event_seq == self._snapshot_seq:
+                os.ftruncate(self._log_fd, 0)
+                return
+            
+            # Events arrived while the snapshot was written; keep only those
+            os.close(self._log_fd)
+            self._log_fd = None
+            tmp_path = self._log_path.with_name(self._log_path.name + ".tmp")
+            with open(self._log_path, 'rb') as src, open(tmp_path, 'wb') as dst:
+                for line in src:
+                    if orjson.loads(line)["seq"] > self._snapshot_seq:
+                        dst.write(line)
+            os.replace(tmp_path, self._log_path)
+            self._log_fd = os.open(self._log_path, _EVENT_LOG_OPEN_FLAGS, 0o644)
+    
+    def _replay_event_log(self) -> int:
+        """Apply logged events newer than the loaded snapshot; returns how many were applied."""
+        if not self._log_path.exists():
+            return 0
+        
+        # Replayed events were already reported when first applied; don't notify again
+        callbacks = self.game_state.state_change_callbacks
+        self.game_state.state_change_callbacks = []
+        replayed = 0
+        # End of the last complete record
+        good_end = 0
+        try:
+            with open(self._log_path, 'rb') as f:
+                for line in f:
+                    try:
+                        if not line.endswith(b'\n'):
+                            raise ValueError("unterminated record")
+                        record = orjson.loads(line)
+                    except ValueError:
+                        # Torn final line from a crash mid-append
+                        break
+                    good_end += len(line)
+                    seq = record["seq"]
+                    if seq <= self._event_seq:
+                        continue
+                    event_data = record["event"]
+                    event_class = EVENT_CLASSES.get(event_data.get("event_type"), UnknownEvent)
+                    self.game_state.process_event(event_class.model_validate(event_data))
+                    self._event_seq = seq
+                    replayed += 1
+        finally:
+            self.game_state.state_change_callbacks = callbacks
+        
+        # Cut off the torn line, so events appended from here on are not stuck behind it
+        if good_end < self._log_path.stat().st_size:
+            os.truncate(self._log_path, good_end)
+            logger.warning("Truncated torn record at the end of the event log")
+        return replayed
+    
     def _load_persisted_state(self) -> bool:
         """Load persisted game state from file."""
         try:
-            if not Path(self.persistence_file).exists():
+            if not self._persist_path.exists():
+                return False
+            
+            with open(self._persist_path, 'rb') as f:
+                data = f.read()
+            
+            # Check the version from the envelope alone before touching the game state
+            header = _read_envelope_header(data)
+            if header is not None and header.get("version") != "1.0.0":
+                logger.warning("Persisted state version mismatch")
                 return False
             
-            with open(self.persistence_file, 'r', encoding='utf-8') as f:
-                persistence_data = json.load(f)
+            # Parse and validate straight from the JSON bytes, without an intermediate dict tree
+            persistence_data = _persisted_state_adapter().validate_json(data)
             
             # Validate version
-            if persistence_data.get("version") != "1.0.0":
+            if persistence_data["version"] != "1.0.0":
                 logger.warning("Persisted state version mismatch")
                 return False
             
             # Load game state
-            game_state_data = persistence_data.get("game_state", {})
-            if game_state_data:
-                self.game_state = GameState(**game_state_data)
+            game_state = persistence_data.get("game_state")
+            if game_state is not None:
+                self.game_state = game_state
+                self._event_seq = self._snapshot_seq = persistence_data.get("event_seq", 0)
+                self.game_state.add_state_change_callback(self._handle_state_change)
                 return True
             
             return False
@@ -219,9 +537,18 @@ class StateManager:
     def clear_persisted_state(self) -> bool:
         """Clear persisted state file."""
         try:
-            if Path(self.persistence_file).exists():
-                Path(self.persistence_file).unlink()
-                logger.info("Cleared persisted state")
+            # Drop any pending write so it cannot recreate the file
+            with self._persist_cv:
+                self._persist_pending = False
+            with self._persist_lock:
+                if self._persist_path.exists():
+                    self._persist_path.unlink()
+                    logger.info("Cleared persisted state")
+                with self._state_lock:
+                    if self._log_fd is not None:
+                        os.ftruncate(self._log_fd, 0)
+                    elif self._log_path.exists():
+                        self._log_path.unlink()
             return True
             
         except Exception as e:
@@ -230,45 +557,58 @@ class StateManager:
     
     def validate_state(self) -> List[str]:
         """Validate the current game state for consistency."""
+        game_state = self.game_state
+        key = (id(game_state), game_state.revision, game_state.game_id, game_state.status,
+               _player_validation_key(game_state.self_player),
+               _player_validation_key(game_state.opponent_player))
+        if key != self._validation_key:
+            self._validation_errors = self._compute_validation_errors()
+            self._validation_key = key
+        return list(self._validation_errors)
+    
+    def _compute_validation_errors(self) -> List[str]:
+        """Run every consistency check against the current game state."""
         errors = []
+        game_state = self.game_state
+        self_player = game_state.self_player
+        opponent_player = game_state.opponent_player
         
         try:
             # Check basic game state
-            if not self.game_state.game_id:
+            if not game_state.game_id:
                 errors.append("Game ID not set")
             
-            if self.game_state.status not in [GameStatus.WAITING, GameStatus.STARTING, 
-                                            GameStatus.ACTIVE, GameStatus.ENDED, GameStatus.PAUSED]:
-                errors.append(f"Invalid game status: {self.game_state.status}")
+            if game_state.status not in _VALID_STATUSES:
+                errors.append(f"Invalid game status: {game_state.status}")
             
             # Check players
-            if not self.game_state.self_player:
+            if not self_player:
                 errors.append("Self player not initialized")
-            elif self.game_state.self_player.life_total < 0:
+            elif self_player.life_total < 0:
                 errors.append("Self player has negative life total")
             
-            if not self.game_state.opponent_player:
+            if not opponent_player:
                 errors.append("Opponent player not initialized")
-            elif self.game_state.opponent_player.life_total < 0:
+            elif opponent_player.life_total < 0:
                 errors.append("Opponent player has negative life total")
             
             # Check hand sizes
-            if self.game_state.self_player:
-                hand_size = self.game_state.self_player.hand.size()
-                if hand_size > self.game_state.self_player.max_hand_size:
+            if self_player:
+                hand_size = self_player.hand.size()
+                if hand_size > self_player.max_hand_size:
                     errors.append(f"Self player hand size exceeds maximum: {hand_size}")
             
-            if self.game_state.opponent_player:
-                hand_size = self.game_state.opponent_player.hand.size()
-                if hand_size > self.game_state.opponent_player.max_hand_size:
+            if opponent_player:
+                hand_size = opponent_player.hand.size()
+                if hand_size > opponent_player.max_hand_size:
                     errors.append(f"Opponent player hand size exceeds maximum: {hand_size}")
             
             # Check for duplicate cards
-            if self.game_state.self_player:
-                self._check_duplicate_cards(self.game_state.self_player, "self", errors)
+            if self_player:
+                self._check_duplicate_cards(self_player, "self", errors)
             
-            if self.game_state.opponent_player:
-                self._check_duplicate_cards(self.game_state.opponent_player, "opponent", errors)
+            if opponent_player:
+                self._check_duplicate_cards(opponent_player, "opponent", errors)
             
         except Exception as e:
             errors.append(f"Error during state validation: {e}")
@@ -278,49 +618,53 @@ class StateManager:
     def _check_duplicate_cards(self, player: PlayerState, player_name: str, errors: List[str]) -> None:
         """Check for duplicate cards in a player's state."""
         # Check hand
-        hand_instance_ids = [card.instance_id for card in player.hand.cards]
-        if len(hand_instance_ids) != len(set(hand_instance_ids)):
+        if _has_duplicate_cards(player.hand.cards):
             errors.append(f"{player_name} player has duplicate cards in hand")
         
         # Check battlefield
-        battlefield_instance_ids = [card.instance_id for card in player.battlefield.get_all_cards()]
-        if len(battlefield_instance_ids) != len(set(battlefield_instance_ids)):
+        if _has_duplicate_cards(player.battlefield.iter_all_cards()):
             errors.append(f"{player_name} player has duplicate cards on battlefield")
         
         # Check graveyard
-        graveyard_instance_ids = [card.instance_id for card in player.graveyard.cards]
-        if len(graveyard_instance_ids) != len(set(graveyard_instance_ids)):
+        if _has_duplicate_cards(player.graveyard.cards):
             errors.append(f"{player_name} player has duplicate cards in graveyard")
     
-    def get_state_statistics(self) -> Dict[str, Any]:
-        """Get statistics about the current state."""
+    def get_state_statistics(self, include_validation: bool = False) -> Dict[str, Any]:
+        """Get statistics about the current state (validation error count is opt-in).
+        
+        Returns a shallow copy of the cached statistics; the nested player
+        dicts are shared and must be treated as read-only.
+        """
+        game_state = self.game_state
+        # Validation has its own cache; only the error count feeds the statistics
+        validation_errors = len(self.validate_state()) if include_validation else None
+        key = (id(game_state), game_state.revision, game_state.game_id, game_state.status,
+               game_state.turn_number, game_state.current_phase, game_state.active_player,
+               len(game_state.event_history), len(game_state.state_changes),
+               _player_statistics_key(game_state.self_player),
+               _player_statistics_key(game_state.opponent_player), validation_errors)
+        if key == self._stats_key:
+            return dict(self._stats_cache)
+        
         stats = {
-            "game_id": self.game_state.game_id,
-            "status": self.game_state.status,
-            "turn_number": self.game_state.turn_number,
-            "current_phase": self.game_state.current_phase,
-            "active_player": self.game_state.active_player,
-            "event_count": len(self.game_state.event_history),
-            "state_change_count": len(self.game_state.state_changes),
-            "validation_errors": len(self.validate_state())
+            "game_id": game_state.game_id,
+            "status": game_state.status,
+            "turn_number": game_state.turn_number,
+            "current_phase": game_state.current_phase,
+            "active_player": game_state.active_player,
+            "event_count": len(game_state.event_history),
+            "state_change_count": len(game_state.state_changes),
         }
         
-        if self.game_state.self_player:
-            stats["self_player"] = {
-                "life_total": self.game_state.self_player.life_total,
-                "hand_size": self.game_state.self_player.hand.size(),
-                "creature_count": self.game_state.self_player.get_creature_count(),
-                "land_count": self.game_state.self_player.get_land_count(),
-                "mana_pool": self.game_state.self_player.get_mana_summary()
-            }
+        if validation_errors is not None:
+            stats["validation_errors"] = validation_errors
+        
+        if game_state.self_player:
+            stats["self_player"] = _player_statistics(game_state.self_player)
         
-        if self.game_state.opponent_player:
-            stats["opponent_player"] = {
-                "life_total": self.game_state.opponent_player.life_total,
-                "hand_size": self.game_state.opponent_player.hand.size(),
-                "creature_count": self.game_state.opponent_player.get_creature_count(),
-                "land_count": self.game_state.opponent_player.get_land_count(),
-                "mana_pool": self.game_state.opponent_player.get_mana_summary()
-            }
+        if game_state.opponent_player:
+            stats["opponent_player"] = _player_statistics(game_state.opponent_player)
         
-        return stats
+        self._stats_key = key
+        self._stats_cache = stats
+        return dict(stats)
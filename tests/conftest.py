@@ -0,0 +1,29 @@
+"""
+Shared pytest configuration.
+
+The root-level conftest.py puts the project root on sys.path, so test
+modules import the top-level packages directly.
+"""
+
+import pytest
+
+
+def pytest_addoption(parser):
+    """Register the --runslow option."""
+    parser.addoption(
+        "--runslow", action="store_true", default=False,
+        help="run tests marked slow (real sockets, nightly runs)"
+    )
+
+def pytest_configure(config):
+    """Register custom markers."""
+    config.addinivalue_line("markers", "slow: test uses real I/O; only runs with --runslow")
+
+def pytest_collection_modifyitems(config, items):
+    """Skip slow tests unless --runslow is given."""
+    if config.getoption("--runslow"):
+        return
+    skip_slow = pytest.mark.skip(reason="needs --runslow")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
@@ -10,11 +10,6 @@ import asyncio
 from datetime import datetime
 from typing import Dict, Any
 
-# Add parent directory to path for imports
-import sys
-from pathlib import Path
-sys.path.append(str(Path(__file__).parent.parent))
-
 from state.game_state import GameState, GameStatus, Phase
 from state.player_state import PlayerState, PlayerType, ManaPool
 from parser.events import CardInfo, CardType, ZoneType
@@ -29,64 +24,75 @@ from rules.timing_rules import TimingRules
 from rules.mana_system import ManaSystem, ManaCost
 from rules.card_restrictions import CardRestrictionEngine
 
+def _land_in_hand(name: str, instance_id: int = 1, grp_id: int = 12345) -> CardInfo:
+    """Build a basic land in player 1's hand."""
+    return CardInfo(
+        instance_id=instance_id,
+        grp_id=grp_id,
+        name=name,
+        card_types=[CardType.LAND],
+        controller=1,
+        zone_id=2,
+        zone_type=ZoneType.HAND
+    )
+
+@pytest.fixture
+def plains():
+    """Plains in player 1's hand."""
+    return _land_in_hand("Plains")
+
 class TestManaCost:
     """Test cases for mana cost parsing."""
     
-    def test_basic_mana_cost(self):
-        """Test parsing basic mana costs."""
-        cost = ManaCost("{W}")
+    @pytest.mark.parametrize("cost_string, expected", [
+        pytest.param("{W}", {
+            'white': 1, 'blue': 0, 'black': 0, 'red': 0, 'green': 0,
+            'colorless': 0, 'generic': 0
+        }, id="basic"),
+        pytest.param("{2}{W}{U}{B}{R}{G}", {
+            'white': 1, 'blue': 1, 'black': 1, 'red': 1, 'green': 1,
+            'generic': 2, 'get_total_cost': 7
+        }, id="complex"),
+        pytest.param("", {'get_total_cost': 0, 'is_colorless': True}, id="empty"),
+        pytest.param("{3}", {
+            'generic': 3, 'is_colorless': True, 'is_mono_colored': False
+        }, id="colorless"),
+        pytest.param("{W}{W}{W}", {
+            'white': 3, 'is_mono_colored': True, 'get_primary_color': 'white'
+        }, id="mono_colored"),
+    ])
+    def test_mana_cost_parsing(self, cost_string, expected):
+        """Test parsing mana costs into colored and generic amounts."""
+        cost = ManaCost(cost_string)
+        for name, value in expected.items():
+            actual = getattr(cost, name)
+            if callable(actual):
+                actual = actual()
+            assert actual == value, name
+    
+    @pytest.mark.parametrize("cost_string, field, symbols", [
+        pytest.param("{W/U}{2/U}", 'hybrid', ["W/U", "2/U"], id="hybrid"),
+        pytest.param("{W/P}{U/P}", 'phyrexian', ["W/P", "U/P"], id="phyrexian"),
+    ])
+    def test_special_mana_symbols(self, cost_string, field, symbols):
+        """Test parsing hybrid and Phyrexian mana symbols."""
+        cost = ManaCost(cost_string)
+        parsed = getattr(cost, field)
+        assert len(parsed) == len(symbols)
+        for symbol in symbols:
+            assert symbol in parsed
+    
+    def test_interned_mana_cost(self):
+        """Test that parsed costs are shared per cost string."""
+        cost = ManaCost.get("{1}{W}")
+        assert cost is ManaCost.get("{1}{W}")
+        assert cost.generic == 1
         assert cost.white == 1
-        assert cost.blue == 0
-        assert cost.black == 0
-        assert cost.red == 0
-        assert cost.green == 0
-        assert cost.colorless == 0
-        assert cost.generic == 0
-    
-    def test_complex_mana_cost(self):
-        """Test parsing complex mana costs."""
-        cost = ManaCost("{2}{W}{U}{B}{R}{G}")
-        assert cost.white == 1
-        assert cost.blue == 1
-        assert cost.black == 1
-        assert cost.red == 1
-        assert cost.green == 1
-        assert cost.generic == 2
-        assert cost.get_total_cost() == 7
-    
-    def test_hybrid_mana_cost(self):
-        """Test parsing hybrid mana costs."""
-        cost = ManaCost("{W/U}{2/U}")
-        assert len(cost.hybrid) == 2
-        assert "W/U" in cost.hybrid
-        assert "2/U" in cost.hybrid
-    
-    def test_phyrexian_mana_cost(self):
-        """Test parsing Phyrexian mana costs."""
-        cost = ManaCost("{W/P}{U/P}")
-        assert len(cost.phyrexian) == 2
-        assert "W/P" in cost.phyrexian
-        assert "U/P" in cost.phyrexian
-    
-    def test_empty_mana_cost(self):
-        """Test parsing empty mana cost."""
-        cost = ManaCost("")
-        assert cost.get_total_cost() == 0
-        assert cost.is_colorless()
-    
-    def test_colorless_mana_cost(self):
-        """Test parsing colorless mana cost."""
-        cost = ManaCost("{3}")
-        assert cost.generic == 3
-        assert cost.is_colorless()
-        assert not cost.is_mono_colored()
-    
-    def test_mono_colored_mana_cost(self):
-        """Test parsing mono-colored mana cost."""
-        cost = ManaCost("{W}{W}{W}")
-        assert cost.white == 3
-        assert cost.is_mono_colored()
-        assert cost.get_primary_color() == 'white'
+
+        # Shared costs cannot be adjusted in place
+        with pytest.raises(AttributeError):
+            cost.generic = 0
+        assert ManaCost.get("{1}{W}").generic == 1
 
 class TestManaSystem:
     """Test cases for mana system."""
@@ -135,6 +141,61 @@ class TestManaSystem:
         assert not self.mana_system.can_pay_cost("{W}{W}", player)
         assert not self.mana_system.pay_cost("{W}{W}", player)
     
+    def test_can_pay_many(self):
+        """Test checking several costs against one pool."""
+        player = self.game_state.get_self_player()
+        
+        player.mana_pool.white = 2
+        player.mana_pool.blue = 1
+        
+        costs = ["", "{W}", "{1}{U}", "{B}", "{2}{W}{U}", "{W/B}"]
+        assert self.mana_system.can_pay_many(costs, player) == [
+            True, True, True, False, False, True
+        ]
+
+        # A malformed cost fails alone, as it does for a single check
+        costs = ["{W}", "{²}", "{U}"]
+        assert not self.mana_system.can_pay_cost("{²}", player)
+        assert self.mana_system.can_pay_many(costs, player) == [True, False, True]
+        assert self.mana_system.can_pay_many(["{W}", ["{U}"], "{U}"], player) == [True, False, True]
+    
+    @pytest.mark.parametrize("cost, white, life, payable, white_after, life_after", [
+        pytest.param("{W/P}", 1, 20, True, 0, 20, id="mana"),
+        # The white mana is needed for the generic part, so the symbol costs life
+        pytest.param("{1}{W/P}", 1, 20, True, 0, 18, id="life_for_generic"),
+        pytest.param("{W}{W/P}", 1, 1, False, 1, 1, id="too_little_life"),
+    ])
+    def test_pay_phyrexian_mana(self, cost, white, life, payable, white_after, life_after):
+        """Test Phyrexian symbols fall back to life, and checking agrees with paying."""
+        player = self.game_state.get_self_player()
+        player.mana_pool.white = white
+        player.life_total = life
+
+        assert self.mana_system.can_pay_cost(cost, player) == payable
+        assert self.mana_system.pay_cost(cost, player) == payable
+        assert player.mana_pool.white == white_after
+        assert player.life_total == life_after
+
+    @pytest.mark.parametrize("cost, white, blue, white_after, blue_after", [
+        # Options are tried in the order written, so the generic option comes first
+        pytest.param("{2/U}", 2, 1, 0, 1, id="generic_first"),
+        pytest.param("{3/U}", 1, 1, 1, 0, id="generic_unaffordable"),
+        pytest.param("{U/W}", 1, 1, 1, 0, id="first_color"),
+        # The generic option would leave nothing for the plain generic cost
+        pytest.param("{1}{2/U}", 1, 1, 0, 0, id="generic_still_owed"),
+        pytest.param("{2/U}{1}", 1, 1, 0, 0, id="generic_written_after"),
+    ])
+    def test_pay_hybrid_mana(self, cost, white, blue, white_after, blue_after):
+        """Test hybrid symbols are paid with the first option the pool can cover."""
+        player = self.game_state.get_self_player()
+        player.mana_pool.white = white
+        player.mana_pool.blue = blue
+
+        assert self.mana_system.can_pay_cost(cost, player)
+        assert self.mana_system.pay_cost(cost, player)
+        assert player.mana_pool.white == white_after
+        assert player.mana_pool.blue == blue_after
+
     def test_generate_mana(self):
         """Test generating mana."""
         player = self.game_state.get_self_player()
@@ -159,6 +220,23 @@ class TestManaSystem:
         assert summary['white'] == 2
         assert summary['blue'] == 1
         assert summary['total'] == 3
+    
+    def test_can_generate_mana_tracks_battlefield(self):
+        """Test that mana generation follows battlefield changes."""
+        player = self.game_state.get_self_player()
+        
+        assert not self.mana_system.can_generate_mana(player, 'blue')
+        
+        island = CardInfo(
+            instance_id=1, grp_id=12345, name="Island",
+            card_types=[CardType.LAND], controller=1, zone_id=1
+        )
+        player.battlefield.add_card(island)
+        assert self.mana_system.can_generate_mana(player, 'blue')
+        assert not self.mana_system.can_generate_mana(player, 'red')
+        
+        player.battlefield.remove_card(1)
+        assert not self.mana_system.can_generate_mana(player, 'blue')
 
 class TestCardRestrictions:
     """Test cases for card restrictions."""
@@ -169,45 +247,26 @@ class TestCardRestrictions:
         self.game_state.initialize_game(1, 2, 20)
         self.restriction_engine = CardRestrictionEngine(self.game_state)
     
-    def test_can_play_land(self):
+    def test_can_play_land(self, plains):
         """Test playing a land."""
         player = self.game_state.get_self_player()
         
-        # Create land card
-        land = CardInfo(
-            instance_id=1,
-            grp_id=12345,
-            name="Plains",
-            card_types=[CardType.LAND],
-            controller=1,
-            zone_id=2,
-            zone_type=ZoneType.HAND
-        )
-        
         # Add to hand
-        player.hand.add_card(land)
+        player.hand.add_card(plains)
         
         # Test playing land
-        assert self.restriction_engine.can_play_card(land, player)
+        assert self.restriction_engine.can_play_card(plains, player)
         
         # Play the land
-        player.battlefield.add_card(land)
-        player.hand.remove_card(land.instance_id)
+        player.battlefield.add_card(plains)
+        player.hand.remove_card(plains.instance_id)
         player.has_played_land_this_turn = True
         
         # Test playing another land
-        land2 = CardInfo(
-            instance_id=2,
-            grp_id=12346,
-            name="Island",
-            card_types=[CardType.LAND],
-            controller=1,
-            zone_id=2,
-            zone_type=ZoneType.HAND
-        )
+        island = _land_in_hand("Island", instance_id=2, grp_id=12346)
         
-        player.hand.add_card(land2)
-        assert not self.restriction_engine.can_play_card(land2, player)
+        player.hand.add_card(island)
+        assert not self.restriction_engine.can_play_card(island, player)
     
     def test_can_play_legendary(self):
         """Test playing legendary cards."""
@@ -344,58 +403,62 @@ class TestTimingRules:
         self.game_state.initialize_game(1, 2, 20)
         self.timing_rules = TimingRules(self.game_state)
     
-    def test_can_perform_action_during_main_phase(self):
+    def test_can_perform_action_during_main_phase(self, plains):
         """Test performing actions during main phase."""
         # Set to main phase
         self.game_state.set_phase(Phase.FIRST_MAIN)
         
         # Create action
-        from rules.action_types import PlayLandAction, CardInfo, CardType, ZoneType
-        
-        land = CardInfo(
-            instance_id=1,
-            grp_id=12345,
-            name="Plains",
-            card_types=[CardType.LAND],
-            controller=1,
-            zone_id=2,
-            zone_type=ZoneType.HAND
-        )
-        
         action = PlayLandAction(
             player_id=1,
-            card=land
+            card=plains
         )
         
         # Test action
         assert self.timing_rules.can_perform_action(action, 1)
     
-    def test_cannot_perform_action_during_wrong_phase(self):
+    def test_cannot_perform_action_during_wrong_phase(self, plains):
         """Test that actions cannot be performed during wrong phase."""
         # Set to combat phase
         self.game_state.set_phase(Phase.COMBAT_BEGIN)
         
         # Create action
-        from rules.action_types import PlayLandAction, CardInfo, CardType, ZoneType
-        
-        land = CardInfo(
-            instance_id=1,
-            grp_id=12345,
-            name="Plains",
-            card_types=[CardType.LAND],
-            controller=1,
-            zone_id=2,
-            zone_type=ZoneType.HAND
-        )
-        
         action = PlayLandAction(
             player_id=1,
-            card=land
+            card=plains
         )
         
         # Test action
         assert not self.timing_rules.can_perform_action(action, 1)
     
+    def test_cached_timing_follows_phase_changes(self, plains):
+        """Test that cached timing decisions are refreshed on phase changes."""
+        self.game_state.set_active_player(1)
+        self.game_state.set_phase(Phase.FIRST_MAIN)
+        
+        action = PlayLandAction(player_id=1, card=plains)
+        
+        assert self.timing_rules.can_perform_action(action, 1)
+        assert self.timing_rules.can_perform_action(action, 1)
+        
+        self.game_state.set_phase(Phase.COMBAT_BEGIN)
+        assert not self.timing_rules.can_perform_action(action, 1)
+        
+        self.game_state.set_phase(Phase.SECOND_MAIN)
+        assert self.timing_rules.can_perform_action(action, 1)
+
+    def test_batch_legal(self, plains):
+        """Test checking timing for several actions at once."""
+        self.game_state.set_active_player(1)
+        self.game_state.set_phase(Phase.FIRST_MAIN)
+
+        actions = [PlayLandAction(player_id=1, card=plains), PlayLandAction(player_id=2, card=plains)]
+
+        assert self.timing_rules.batch_legal(actions, 1) == [
+            self.timing_rules.can_perform_action(action, 1) for action in actions
+        ]
+        assert self.timing_rules.batch_legal(actions, 2) == [False, False]
+
     def test_priority_system(self):
         """Test priority system."""
         # Set active player
@@ -411,7 +474,76 @@ class TestTimingRules:
         # Test priority after passing
         assert not self.timing_rules._player_has_priority(1)
         assert self.timing_rules._player_has_priority(2)
-    
+
+    def test_priority_returns_to_active_player_after_full_round(self):
+        """Test the active player holds priority again once everyone passed and the phase moved on."""
+        self.game_state.set_active_player(1)
+        self.game_state.set_phase(Phase.FIRST_MAIN)
+
+        assert self.timing_rules.pass_priority(1)
+        assert self.timing_rules._player_has_priority(2)
+        assert self.timing_rules.pass_priority(2)
+
+        assert self.game_state.current_phase == Phase.COMBAT_BEGIN
+        assert self.timing_rules._player_has_priority(1)
+        assert not self.timing_rules._player_has_priority(2)
+
+    def test_priority_check_matches_priority_holder(self):
+        """Test the priority check for active and non-active players, before and after passing."""
+        self.game_state.set_active_player(1)
+        action = PassPriorityAction(player_id=1)
+
+        # Nobody has passed: only the active player holds priority
+        for player_id, expected in ((1, True), (2, False)):
+            assert self.timing_rules._check_priority(action, player_id) == expected
+            assert self.timing_rules._player_has_priority(player_id) == expected
+
+        # Active player passed: priority moves to the non-active player
+        self.timing_rules.pass_priority(1)
+        for player_id, expected in ((1, False), (2, True)):
+            assert self.timing_rules._check_priority(action, player_id) == expected
+            assert self.timing_rules._player_has_priority(player_id) == expected
+
+    def test_pass_priority_with_players_set_directly(self):
+        """Test players set up without a game_initialized change still count for priority."""
+        game_state = GameState(
+            status=GameStatus.ACTIVE,
+            self_player=PlayerState(player_id=1, player_type=PlayerType.SELF),
+            opponent_player=PlayerState(player_id=2, player_type=PlayerType.OPPONENT)
+        )
+        game_state.set_active_player(1)
+        timing_rules = TimingRules(game_state)
+
+        assert timing_rules.pass_priority(1)
+        assert not timing_rules._all_players_passed_priority()
+        assert timing_rules._passed_players() == (1,)
+
+    def test_close_unregisters_callback(self):
+        """Test timing rules stop following the game state once closed or collected."""
+        callbacks = self.game_state.state_change_callbacks
+        assert len(callbacks) == 1
+
+        self.timing_rules.close()
+        assert callbacks == []
+
+        TimingRules(self.game_state)
+        assert callbacks == []
+
+    @pytest.mark.parametrize("abilities, expected", [
+        pytest.param(["Counter target spell."], True, id="sentence"),
+        pytest.param(["Counter, then scry 1"], True, id="comma"),
+        pytest.param(["Put two +1/+1 counters on it"], True, id="plural"),
+        pytest.param(["Draw a card."], False, id="no_counter"),
+    ])
+    def test_can_counter_spell(self, abilities, expected):
+        """Test counterspell detection ignores punctuation around the keyword."""
+        spell = CardInfo(
+            instance_id=1, grp_id=1, name="Spell", card_types=[CardType.INSTANT],
+            abilities=abilities, controller=1, zone_id=2
+        )
+        target = PassPriorityAction(player_id=2)
+        assert self.timing_rules._can_counter_spell(spell, target) == expected
+
     def test_priority_info(self):
         """Test getting priority information."""
         # Set active player
@@ -449,31 +581,17 @@ class TestLegalityEngine:
     def test_is_action_legal(self):
         """Test checking if an action is legal."""
         # Create action
-        from rules.action_types import PassPriorityAction
-        
         action = PassPriorityAction(player_id=1)
         
         # Test legality
         assert self.legality_engine.is_action_legal(action)
     
-    def test_illegal_action(self):
+    def test_illegal_action(self, plains):
         """Test illegal action."""
         # Create illegal action
-        from rules.action_types import PlayLandAction, CardInfo, CardType, ZoneType
-        
-        land = CardInfo(
-            instance_id=1,
-            grp_id=12345,
-            name="Plains",
-            card_types=[CardType.LAND],
-            controller=1,
-            zone_id=2,
-            zone_type=ZoneType.HAND
-        )
-        
         action = PlayLandAction(
             player_id=1,
-            card=land
+            card=plains
         )
         
         # Test legality (should be illegal because card not in hand)
@@ -487,10 +605,18 @@ class TestLegalityEngine:
         # Get legal actions second time (should use cache)
         actions2 = self.legality_engine.get_legal_actions(1)
         
-        # Should be the same
-        assert len(actions1) == len(actions2)
-        assert all(action1.action_type == action2.action_type 
-                  for action1, action2 in zip(actions1, actions2))
+        # Cache must return the same list, not rebuild an equivalent one
+        assert actions1 is actions2
+
+    def test_legal_actions_cache_expiry(self):
+        """Test legal actions are rebuilt once the cache expires."""
+        actions1 = self.legality_engine.get_legal_actions(1)
+
+        # Age the cache past its lifetime
+        self.legality_engine.cache_timestamp -= self.legality_engine.cache_duration
+
+        actions2 = self.legality_engine.get_legal_actions(1)
+        assert actions1 is not actions2
 
 def run_manual_tests():
     """Run manual tests for action legality."""
@@ -499,8 +625,6 @@ def run_manual_tests():
     
     # Test 1: Mana Cost Parsing
     print("1. Testing mana cost parsing...")
-    from rules.mana_system import ManaCost
-    
     cost = ManaCost("{2}{W}{U}")
     print(f"   Parsed cost: {cost.cost_string}")
     print(f"   White: {cost.white}, Blue: {cost.blue}, Generic: {cost.generic}")
@@ -508,9 +632,6 @@ def run_manual_tests():
     
     # Test 2: Mana System
     print("2. Testing mana system...")
-    from state.game_state import GameState
-    from rules.mana_system import ManaSystem
-    
     game_state = GameState()
     game_state.initialize_game(1, 2, 20)
     mana_system = ManaSystem(game_state)
@@ -525,13 +646,9 @@ def run_manual_tests():
     
     # Test 3: Card Restrictions
     print("3. Testing card restrictions...")
-    from rules.card_restrictions import CardRestrictionEngine
-    
     restriction_engine = CardRestrictionEngine(game_state)
     
     # Create test card
-    from parser.events import CardInfo, CardType, ZoneType
-    
     land = CardInfo(
         instance_id=1,
         grp_id=12345,
@@ -548,15 +665,11 @@ def run_manual_tests():
     
     # Test 4: Timing Rules
     print("4. Testing timing rules...")
-    from rules.timing_rules import TimingRules
-    
     timing_rules = TimingRules(game_state)
     
     # Set to main phase
     game_state.set_phase(Phase.FIRST_MAIN)
     
-    from rules.action_types import PlayLandAction
-    
     action = PlayLandAction(
         player_id=1,
         card=land
@@ -566,8 +679,6 @@ def run_manual_tests():
     
     # Test 5: Legality Engine
     print("5. Testing legality engine...")
-    from rules.legality_engine import LegalityEngine
-    
     legality_engine = LegalityEngine(game_state)
     
     legal_actions = legality_engine.get_legal_actions(1)
@@ -8,12 +8,8 @@ Tests the parser with sample log data and validates event schemas.
 import json
 import pytest
 import asyncio
-from pathlib import Path
 from datetime import datetime
-
-# Add parent directory to path for imports
-import sys
-sys.path.append(str(Path(__file__).parent.parent))
+from unittest.mock import AsyncMock, MagicMock
 
 from parser.log_parser import MTGALogParser
 from parser.events import EventType, GameEvent
@@ -21,29 +17,35 @@ from parser.log_path import MTGALogPath
 from parser.file_tailer import MTGALogTailer, BufferedLogTailer
 from parser.event_bus import EventBusManager
 
+# Sample Unity log lines shared by the parser tests
+SAMPLE_LOG_LINES = (
+    '[UnityCrossThreadLogger] {"greToClientEvent":{"greToClientEvent":{"type":"GREMessageType_GameStateMessage","gameStateMessage":{"gameStateId":1,"turnInfo":{"turnNumber":1,"phase":"FirstMain","step":"PreCombat","activePlayer":1,"priorityPlayer":1},"zones":[{"zoneId":1,"type":"ZoneType_Battlefield","objectInstanceIds":[]},{"zoneId":2,"type":"ZoneType_Hand","objectInstanceIds":[1,2,3,4,5,6,7]}],"objects":[{"instanceId":1,"grpId":12345,"controller":1,"zoneId":2,"visibility":"Visibility_Visible","cardTypes":["CardType_Creature"],"name":"Lightning Bolt","manaCost":"{R}","power":0,"toughness":0,"abilities":[]}]}}}}',
+    '[UnityCrossThreadLogger] {"greToClientEvent":{"greToClientEvent":{"type":"GREMessageType_GameStateMessage","gameStateMessage":{"gameStateId":2,"turnInfo":{"turnNumber":1,"phase":"FirstMain","step":"PreCombat","activePlayer":1,"priorityPlayer":1},"zones":[{"zoneId":1,"type":"ZoneType_Battlefield","objectInstanceIds":[]},{"zoneId":2,"type":"ZoneType_Hand","objectInstanceIds":[1,2,3,4,5,6,7]}],"objects":[{"instanceId":1,"grpId":12345,"controller":1,"zoneId":2,"visibility":"Visibility_Visible","cardTypes":["CardType_Instant"],"name":"Lightning Bolt","manaCost":"{R}","power":0,"toughness":0,"abilities":[]}]}}}}',
+    '[UnityCrossThreadLogger] {"greToClientEvent":{"greToClientEvent":{"type":"GREMessageType_GameStateMessage","gameStateMessage":{"gameStateId":3,"turnInfo":{"turnNumber":1,"phase":"FirstMain","step":"PreCombat","activePlayer":1,"priorityPlayer":1},"zones":[{"zoneId":1,"type":"ZoneType_Battlefield","objectInstanceIds":[]},{"zoneId":2,"type":"ZoneType_Hand","objectInstanceIds":[1,2,3,4,5,6,7]}],"objects":[{"instanceId":1,"grpId":12345,"controller":1,"zoneId":2,"visibility":"Visibility_Visible","cardTypes":["CardType_Land"],"name":"Mountain","manaCost":"","power":0,"toughness":0,"abilities":[]}]}}}}',
+)
+
+@pytest.fixture
+def log_parser():
+    """Fresh parser; it tracks the current phase between lines."""
+    return MTGALogParser()
+
+@pytest.fixture(scope="module")
+def parsed_events():
+    """Events parsed once from the sample lines for read-only checks."""
+    return MTGALogParser().parse_log_lines(SAMPLE_LOG_LINES)
+
 class TestMTGALogParser:
     """Test cases for the log parser."""
     
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.parser = MTGALogParser()
-        
-        # Create sample log data
-        self.sample_log_lines = [
-            '[UnityCrossThreadLogger] {"greToClientEvent":{"greToClientEvent":{"type":"GREMessageType_GameStateMessage","gameStateMessage":{"gameStateId":1,"turnInfo":{"turnNumber":1,"phase":"FirstMain","step":"PreCombat","activePlayer":1,"priorityPlayer":1},"zones":[{"zoneId":1,"type":"ZoneType_Battlefield","objectInstanceIds":[]},{"zoneId":2,"type":"ZoneType_Hand","objectInstanceIds":[1,2,3,4,5,6,7]}],"objects":[{"instanceId":1,"grpId":12345,"controller":1,"zoneId":2,"visibility":"Visibility_Visible","cardTypes":["CardType_Creature"],"name":"Lightning Bolt","manaCost":"{R}","power":0,"toughness":0,"abilities":[]}]}}}}',
-            '[UnityCrossThreadLogger] {"greToClientEvent":{"greToClientEvent":{"type":"GREMessageType_GameStateMessage","gameStateMessage":{"gameStateId":2,"turnInfo":{"turnNumber":1,"phase":"FirstMain","step":"PreCombat","activePlayer":1,"priorityPlayer":1},"zones":[{"zoneId":1,"type":"ZoneType_Battlefield","objectInstanceIds":[]},{"zoneId":2,"type":"ZoneType_Hand","objectInstanceIds":[1,2,3,4,5,6,7]}],"objects":[{"instanceId":1,"grpId":12345,"controller":1,"zoneId":2,"visibility":"Visibility_Visible","cardTypes":["CardType_Instant"],"name":"Lightning Bolt","manaCost":"{R}","power":0,"toughness":0,"abilities":[]}]}}}}',
-            '[UnityCrossThreadLogger] {"greToClientEvent":{"greToClientEvent":{"type":"GREMessageType_GameStateMessage","gameStateMessage":{"gameStateId":3,"turnInfo":{"turnNumber":1,"phase":"FirstMain","step":"PreCombat","activePlayer":1,"priorityPlayer":1},"zones":[{"zoneId":1,"type":"ZoneType_Battlefield","objectInstanceIds":[]},{"zoneId":2,"type":"ZoneType_Hand","objectInstanceIds":[1,2,3,4,5,6,7]}],"objects":[{"instanceId":1,"grpId":12345,"controller":1,"zoneId":2,"visibility":"Visibility_Visible","cardTypes":["CardType_Land"],"name":"Mountain","manaCost":"","power":0,"toughness":0,"abilities":[]}]}}}}'
-        ]
-    
-    def test_parse_unity_log_line(self):
+    def test_parse_unity_log_line(self, log_parser):
         """Test parsing Unity log lines."""
-        for line in self.sample_log_lines:
-            event = self.parser.parse_log_line(line)
+        for line in SAMPLE_LOG_LINES:
+            event = log_parser.parse_log_line(line)
             assert event is not None, f"Failed to parse line: {line[:100]}..."
             assert hasattr(event, 'event_type'), "Event should have event_type"
             assert hasattr(event, 'timestamp'), "Event should have timestamp"
     
-    def test_parse_invalid_line(self):
+    def test_parse_invalid_line(self, log_parser):
         """Test parsing invalid log lines."""
         invalid_lines = [
             "This is not a Unity log line",
@@ -54,36 +56,41 @@ class TestMTGALogParser:
         ]
         
         for line in invalid_lines:
-            event = self.parser.parse_log_line(line)
+            event = log_parser.parse_log_line(line)
             assert event is None, f"Should not parse invalid line: {line}"
     
-    def test_parse_game_state_message(self):
+    def test_parse_game_state_message(self, log_parser):
         """Test parsing game state messages."""
-        line = self.sample_log_lines[0]
-        event = self.parser.parse_log_line(line)
+        line = SAMPLE_LOG_LINES[0]
+        event = log_parser.parse_log_line(line)
         
         assert event is not None, "Should parse game state message"
         assert event.event_type in [EventType.PHASE_CHANGE, EventType.DRAW_CARD], f"Unexpected event type: {event.event_type}"
     
-    def test_parse_multiple_lines(self):
+    def test_parse_multiple_lines(self, parsed_events):
         """Test parsing multiple log lines."""
-        events = self.parser.parse_log_lines(self.sample_log_lines)
-        
-        assert len(events) > 0, "Should parse at least one event"
-        assert all(isinstance(event, GameEvent) for event in events), "All events should be GameEvent instances"
+        assert len(parsed_events) > 0, "Should parse at least one event"
+        assert all(isinstance(event, GameEvent) for event in parsed_events), "All events should be GameEvent instances"
     
-    def test_event_timestamps(self):
+    def test_event_timestamps(self, parsed_events):
         """Test that events have valid timestamps."""
-        events = self.parser.parse_log_lines(self.sample_log_lines)
-        
-        for event in events:
+        for event in parsed_events:
             assert isinstance(event.timestamp, datetime), "Event should have datetime timestamp"
             assert event.timestamp <= datetime.now(), "Event timestamp should not be in the future"
 
+@pytest.fixture(scope="module")
+def sample_log(tmp_path_factory):
+    """Sample log written once per module to a temporary directory."""
+    output_dir = tmp_path_factory.mktemp("sample_logs")
+    detector = MTGALogPath()
+    if not detector.create_sample_log(output_dir):
+        pytest.skip("Could not create sample log")
+    return detector.get_sample_log_path(output_dir)
+
 class TestLogPathDetection:
     """Test cases for log path detection."""
     
-    def test_detect_log_path(self):
+    def test_detect_log_path(self, tmp_path):
         """Test log path detection."""
         detector = MTGALogPath()
         
@@ -92,20 +99,20 @@ class TestLogPathDetection:
         # Path might be None if MTGA not installed, which is OK for testing
         
         # Test with custom path
-        custom_path = "tests/sample_logs/test_log.txt"
+        custom_path = str(tmp_path / "test_log.txt")
         path = detector.detect_log_path(custom_path)
         # Should return None since file doesn't exist
     
-    def test_create_sample_log(self):
+    def test_create_sample_log(self, tmp_path):
         """Test creating sample log file."""
         detector = MTGALogPath()
         
         # Create sample log
-        success = detector.create_sample_log()
+        success = detector.create_sample_log(tmp_path)
         assert success, "Should create sample log successfully"
         
         # Check if file exists
-        sample_path = detector.get_sample_log_path()
+        sample_path = detector.get_sample_log_path(tmp_path)
         assert sample_path.exists(), "Sample log file should exist"
         
         # Validate the file
@@ -114,44 +121,65 @@ class TestLogPathDetection:
 class TestFileTailer:
     """Test cases for file tailer."""
     
-    def test_tailer_creation(self):
+    def test_tailer_creation(self, sample_log):
         """Test creating file tailer."""
-        sample_path = Path("tests/sample_logs/sample_output_log.txt")
-        
         # Create tailer
-        tailer = MTGALogTailer(sample_path, lambda line: None)
+        tailer = MTGALogTailer(sample_log, lambda line: None)
         assert tailer is not None, "Should create tailer"
     
-    def test_buffered_tailer_creation(self):
+    def test_buffered_tailer_creation(self, sample_log):
         """Test creating buffered tailer."""
-        sample_path = Path("tests/sample_logs/sample_output_log.txt")
-        
         # Create buffered tailer
-        tailer = BufferedLogTailer(sample_path, lambda lines: None)
+        tailer = BufferedLogTailer(sample_log, lambda lines: None)
         assert tailer is not None, "Should create buffered tailer"
 
+@pytest.fixture
+def memory_transport(monkeypatch):
+    """Replace the WebSocket server with an in-memory fake."""
+    server = MagicMock()
+    server.sockets[0].getsockname.return_value = ("127.0.0.1", 50000)
+    server.wait_closed = AsyncMock()
+    serve = AsyncMock(return_value=server)
+    monkeypatch.setattr("parser.event_bus.websockets.serve", serve)
+    return serve
+
 class TestEventBus:
     """Test cases for event bus."""
     
     @pytest.mark.asyncio
-    async def test_event_bus_creation(self):
+    async def test_event_bus_creation(self, memory_transport):
         """Test creating event bus."""
-        event_bus = EventBusManager(port=8766)  # Use different port for testing
+        event_bus = EventBusManager(port=0)
         assert event_bus is not None, "Should create event bus"
         
         # Test starting and stopping
         await event_bus.start()
+        memory_transport.assert_awaited_once()
         assert event_bus.event_bus.is_running, "Event bus should be running"
+        assert event_bus.event_bus.port == 50000, "Event bus should report its bound port"
         
         await event_bus.stop()
         assert not event_bus.event_bus.is_running, "Event bus should be stopped"
     
+    @pytest.mark.slow
     @pytest.mark.asyncio
-    async def test_event_broadcasting(self):
+    async def test_event_bus_real_transport(self):
+        """Test starting and stopping the event bus on a real socket."""
+        event_bus = EventBusManager(port=0)  # Let the OS pick a free port
+        
+        await event_bus.start()
+        assert event_bus.event_bus.is_running, "Event bus should be running"
+        assert event_bus.event_bus.port != 0, "Event bus should report its bound port"
+        
+        await event_bus.stop()
+        assert not event_bus.event_bus.is_running, "Event bus should be stopped"
+    
+    @pytest.mark.asyncio
+    async def test_event_broadcasting(self, memory_transport):
         """Test event broadcasting."""
         from parser.events import GameStartEvent, EventType
         
-        event_bus = EventBusManager(port=8767)  # Use different port for testing
+        event_bus = EventBusManager(port=0)
         
         try:
             await event_bus.start()
@@ -169,19 +197,13 @@ class TestEventBus:
         finally:
             await event_bus.stop()
 
-def test_integration():
+def test_integration(sample_log):
     """Integration test for the entire parser pipeline."""
-    # Create sample log
-    detector = MTGALogPath()
-    if not detector.create_sample_log():
-        pytest.skip("Could not create sample log")
-    
     # Parse sample log
     parser = MTGALogParser()
-    sample_path = detector.get_sample_log_path()
     
     events = []
-    with open(sample_path, 'r') as f:
+    with open(sample_log, 'r') as f:
         for line in f:
             event = parser.parse_log_line(line)
             if event:
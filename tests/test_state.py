@@ -5,21 +5,51 @@ Test Suite for Game State Management
 Comprehensive tests for the game state system.
 """
 
+import json
 import pytest
+import pytest_asyncio
 import asyncio
+from collections import deque
 from datetime import datetime
 from typing import Dict, Any
+from pydantic import TypeAdapter, ValidationError
 
-# Add parent directory to path for imports
-import sys
-from pathlib import Path
-sys.path.append(str(Path(__file__).parent.parent))
-
-from state.game_state import GameState, GameStatus, Phase
+from state.game_state import GameState, GameStatus, Phase, EVENT_HISTORY_LIMIT
 from state.player_state import PlayerState, PlayerType, ManaPool, Hand, Battlefield, Graveyard
-from state.state_manager import StateManager
+from state.state_manager import StateManager, SNAPSHOT_EVENTS
 from state.state_integration import StateIntegration, StateIntegrationManager
-from parser.events import GameEvent, EventType, CardInfo, CardType, ZoneType
+from parser.events import (
+    GameEvent, EventType, CardInfo, CardType, ZoneType, CARD_TYPE_BITS,
+    GameStartEvent, LifeChangeEvent, PlayCardEvent, UnknownEvent
+)
+
+GAME_START_EVENT = GameStartEvent(
+    event_type=EventType.GAME_START,
+    player_life=20,
+    opponent_life=20
+)
+
+# Built once per module; each use takes a shallow copy so no test can leak into another
+LIGHTNING_BOLT = CardInfo(
+    instance_id=1,
+    grp_id=12345,
+    name="Lightning Bolt",
+    controller=1,
+    zone_id=2,
+    zone_type=ZoneType.HAND
+)
+
+GRIZZLY_BEARS = CardInfo(
+    instance_id=1,
+    grp_id=12345,
+    name="Grizzly Bears",
+    card_types=[CardType.CREATURE],
+    power=2,
+    toughness=2,
+    controller=1,
+    zone_id=1,
+    zone_type=ZoneType.BATTLEFIELD
+)
 
 class TestPlayerState:
     """Test cases for player state."""
@@ -39,39 +69,36 @@ class TestPlayerState:
         assert player.get_creature_count() == 0
         assert player.get_land_count() == 0
     
-    def test_mana_pool(self):
+    @pytest.mark.parametrize("ops, totals, summary", [
+        pytest.param(
+            [('r', 2), ('u', 1)], [2, 3],
+            {'red': 2, 'blue': 1, 'total': 3}, id="red_then_blue"
+        ),
+        pytest.param(
+            [('g', 1), ('g', 2), ('c', 1)], [1, 3, 4],
+            {'green': 3, 'colorless': 1, 'total': 4}, id="repeated_color"
+        ),
+    ])
+    def test_mana_pool(self, ops, totals, summary):
         """Test mana pool functionality."""
         player = PlayerState(player_id=1, player_type=PlayerType.SELF)
         
-        # Test adding mana
-        assert player.add_mana('r', 2)
-        assert player.mana_pool.red == 2
-        
-        assert player.add_mana('u', 1)
-        assert player.mana_pool.blue == 1
-        
-        # Test total mana
-        assert player.mana_pool.total_mana() == 3
+        # Add mana step by step, recording the running total
+        running = []
+        for color, amount in ops:
+            assert player.add_mana(color, amount)
+            running.append(player.mana_pool.total_mana())
+        assert running == totals
         
         # Test mana summary
-        summary = player.get_mana_summary()
-        assert summary['red'] == 2
-        assert summary['blue'] == 1
-        assert summary['total'] == 3
+        mana_summary = player.get_mana_summary()
+        assert {key: mana_summary[key] for key in summary} == summary
     
     def test_hand_management(self):
         """Test hand management."""
         player = PlayerState(player_id=1, player_type=PlayerType.SELF)
         
-        # Create test card
-        card = CardInfo(
-            instance_id=1,
-            grp_id=12345,
-            name="Lightning Bolt",
-            controller=1,
-            zone_id=2,
-            zone_type=ZoneType.HAND
-        )
+        card = LIGHTNING_BOLT.model_copy()
         
         # Test adding card to hand
         assert player.hand.add_card(card)
@@ -87,23 +114,120 @@ class TestPlayerState:
         assert removed_card is not None
         assert removed_card.name == "Lightning Bolt"
         assert player.hand.size() == 0
-    
-    def test_battlefield_management(self):
-        """Test battlefield management."""
+
+    def test_hand_counter_cards(self):
+        """Test tracking of counterspells in hand."""
+        player = PlayerState(player_id=1, player_type=PlayerType.SELF)
+
+        counterspell = CardInfo(
+            instance_id=1,
+            grp_id=12346,
+            name="Cancel",
+            abilities=["Counter target spell."],
+            controller=1,
+            zone_id=2
+        )
+        bolt = CardInfo(instance_id=2, grp_id=12345, name="Lightning Bolt", controller=1, zone_id=2)
+
+        player.hand.add_card(counterspell)
+        player.hand.add_card(bolt)
+        assert player.hand.counter_cards == [counterspell]
+
+        player.hand.remove_card(1)
+        assert player.hand.counter_cards == []
+
+    def test_move_card(self):
+        """Test moving cards between zones."""
         player = PlayerState(player_id=1, player_type=PlayerType.SELF)
-        
-        # Create test creature
         creature = CardInfo(
             instance_id=1,
             grp_id=12345,
             name="Grizzly Bears",
             card_types=[CardType.CREATURE],
-            power=2,
-            toughness=2,
             controller=1,
-            zone_id=1,
-            zone_type=ZoneType.BATTLEFIELD
+            zone_id=2
         )
+        player.hand.add_card(creature)
+
+        assert player.move_card(1, "battlefield")
+        assert player.hand.get_card(1) is None
+        assert player.battlefield.get_card(1) is creature
+
+        # An updated copy of the card can be placed in the destination
+        updated = creature.model_copy(update={'zone_id': 4})
+        assert player.move_card(1, "graveyard", src_zone="battlefield", card=updated)
+        assert player.get_creature_count() == 0
+        assert player.graveyard.get_card(1) is updated
+
+        # Missing cards and a full hand leave zones untouched
+        assert not player.move_card(2, "hand")
+        player.hand.max_size = 0
+        assert not player.move_card(1, "hand")
+        assert player.graveyard.get_card(1) is updated
+
+    def test_total_power_and_toughness(self):
+        """Test running power/toughness totals."""
+        player = PlayerState(player_id=1, player_type=PlayerType.SELF)
+        for instance_id, power in ((1, 2), (2, 3)):
+            player.battlefield.add_card(CardInfo(
+                instance_id=instance_id,
+                grp_id=12345,
+                name="Bear",
+                card_types=[CardType.CREATURE],
+                power=power,
+                toughness=2,
+                controller=1,
+                zone_id=3
+            ))
+
+        assert player.get_total_power() == 5
+        assert player.get_total_toughness() == 4
+
+        player.battlefield.remove_card(1)
+        assert player.get_total_power() == 3
+        assert player.get_total_toughness() == 2
+
+        # Totals are rebuilt after a serialization round trip
+        adapter = TypeAdapter(PlayerState)
+        restored = adapter.validate_python(adapter.dump_python(player))
+        assert restored.get_total_power() == 3
+
+    def test_battlefield_category_by_type_mask(self):
+        """Test multi-typed cards land in the highest-priority category."""
+        battlefield = Battlefield()
+        types_by_id = {
+            1: [CardType.ARTIFACT, CardType.CREATURE],
+            2: [CardType.ENCHANTMENT, CardType.ARTIFACT],
+            3: [CardType.INSTANT],
+            4: [],
+        }
+        for instance_id, card_types in types_by_id.items():
+            battlefield.add_card(CardInfo(
+                instance_id=instance_id, grp_id=1, name="Card",
+                card_types=card_types, controller=1, zone_id=3
+            ))
+
+        assert [card.instance_id for card in battlefield.creatures] == [1]
+        assert [card.instance_id for card in battlefield.artifacts] == [2]
+        assert [card.instance_id for card in battlefield.other] == [3, 4]
+
+    def test_card_info_derived_values_follow_fields(self):
+        """Test card fields cannot change without the values derived from them."""
+        bears = GRIZZLY_BEARS.model_copy()
+        with pytest.raises(ValidationError):
+            bears.name = "Forest"
+        assert isinstance(bears.card_types, tuple)
+
+        land = bears.model_copy(update={'name': "Forest", 'card_types': (CardType.LAND,)})
+        assert land.name_lower == "forest"
+        assert land.card_type_mask & CARD_TYPE_BITS[CardType.LAND]
+        assert bears.name_lower == "grizzly bears"
+
+    def test_battlefield_management(self):
+        """Test battlefield management."""
+        player = PlayerState(player_id=1, player_type=PlayerType.SELF)
+        
+        creature = GRIZZLY_BEARS.model_copy()
         
         # Test adding creature to battlefield
         assert player.battlefield.add_card(creature)
@@ -122,25 +246,33 @@ class TestPlayerState:
         assert removed_creature.name == "Grizzly Bears"
         assert player.get_creature_count() == 0
     
-    def test_life_management(self):
+    @pytest.mark.parametrize("ops, results, life_totals, alive", [
+        # Damage past zero only takes as much as the remaining life total
+        pytest.param(
+            [('take_damage', 5), ('gain_life', 3), ('take_damage', 25)],
+            [5, 3, 18], [15, 18, 0], False,
+            id="damage_gain_overkill"
+        ),
+        pytest.param(
+            [('gain_life', 2), ('take_damage', 0), ('gain_life', -1)],
+            [2, 0, 0], [22, 22, 22], True,
+            id="gain_and_ignored_amounts"
+        ),
+    ])
+    def test_life_management(self, ops, results, life_totals, alive):
         """Test life total management."""
         player = PlayerState(player_id=1, player_type=PlayerType.SELF, life_total=20)
         
-        # Test taking damage
-        damage_taken = player.take_damage(5)
-        assert damage_taken == 5
-        assert player.life_total == 15
-        
-        # Test gaining life
-        life_gained = player.gain_life(3)
-        assert life_gained == 3
-        assert player.life_total == 18
-        
-        # Test taking more damage than life
-        damage_taken = player.take_damage(25)
-        assert damage_taken == 18  # Can only take as much as life total
-        assert player.life_total == 0
-        assert not player.is_alive()
+        # Apply each change, recording what it returned and the new life total
+        returned = []
+        totals = []
+        for method, amount in ops:
+            returned.append(getattr(player, method)(amount))
+            totals.append(player.life_total)
+        
+        assert returned == results
+        assert totals == life_totals
+        assert player.is_alive() == alive
     
     def test_turn_flags(self):
         """Test turn-specific flags."""
@@ -155,6 +287,16 @@ class TestPlayerState:
         assert player.use_ability("test_ability")
         assert not player.can_use_ability("test_ability")
         
+        # Used abilities survive a serialization round trip, as names
+        assert player.use_ability("other_ability")
+        adapter = TypeAdapter(PlayerState)
+        data = adapter.dump_python(player, mode='json')
+        assert sorted(data["has_used_ability_this_turn"]) == ["other_ability", "test_ability"]
+        restored = adapter.validate_json(adapter.dump_json(player))
+        assert not restored.can_use_ability("test_ability")
+        assert not restored.can_use_ability("other_ability")
+        assert restored.can_use_ability("unused_ability")
+        
         # Test resetting flags
         player.reset_turn_flags()
         assert player.can_use_ability("test_ability")
@@ -204,6 +346,13 @@ class TestGameState:
         assert player_3 is None
         assert player_1.player_id == 1
         assert player_2.player_id == 2
+        
+        # Players assigned directly are found by ID straight away
+        game_state.opponent_player = PlayerState(player_id=3, player_type=PlayerType.OPPONENT)
+        assert game_state.get_player(3) is game_state.opponent_player
+        assert game_state.get_player(2) is None
+        assert game_state.set_active_player(3)
+        assert game_state.get_active_player() is game_state.opponent_player
     
     def test_phase_management(self):
         """Test phase management."""
@@ -254,6 +403,10 @@ class TestGameState:
         assert summary["turn_number"] == 0
         assert summary["self_player"]["life_total"] == 20
         assert summary["opponent_player"]["life_total"] == 20
+
+        # Changing the returned summary leaves the cached one intact
+        summary["turn_number"] = 5
+        assert game_state.get_game_summary()["turn_number"] == 0
     
     def test_game_status(self):
         """Test game status management."""
@@ -273,13 +426,88 @@ class TestGameState:
         assert not game_state.is_game_active()
         assert game_state.is_game_ended()
 
+    def test_play_land_event(self):
+        """Test playing a land from hand."""
+        game_state = GameState()
+        game_state.initialize_game(1, 2, 20)
+
+        land = CardInfo(
+            instance_id=1, grp_id=1001, name="Forest",
+            card_types=[CardType.LAND], controller=1, zone_id=1
+        )
+        game_state.self_player.hand.add_card(land)
+
+        event = PlayCardEvent(
+            player=1, card=land,
+            from_zone=ZoneType.HAND, to_zone=ZoneType.BATTLEFIELD
+        )
+        assert game_state.process_event(event)
+        assert game_state.self_player.hand.size() == 0
+        assert game_state.self_player.get_land_count() == 1
+        assert game_state.self_player.has_played_land_this_turn
+
+    def test_play_card_places_event_card(self):
+        """Test the played card's details come from the event, not the hand copy."""
+        game_state = GameState()
+        game_state.initialize_game(1, 2, 20)
+
+        # The hand only knew the card's instance ID
+        game_state.self_player.hand.add_card(CardInfo(
+            instance_id=1, grp_id=1001, name="Unknown", controller=1, zone_id=2
+        ))
+        land = CardInfo(
+            instance_id=1, grp_id=1001, name="Forest",
+            card_types=[CardType.LAND], controller=1, zone_id=1
+        )
+
+        assert game_state.process_event(PlayCardEvent(
+            player=1, card=land,
+            from_zone=ZoneType.HAND, to_zone=ZoneType.BATTLEFIELD
+        ))
+        assert game_state.self_player.battlefield.lands == [land]
+        assert game_state.self_player.has_played_land_this_turn
+
+    def test_batched_notifications(self):
+        """Test that batched notifications keep only the last phase change."""
+        game_state = GameState()
+        game_state.initialize_game(1, 2, 20)
+
+        changes = []
+        game_state.add_state_change_callback(lambda change_type, data: changes.append((change_type, data)))
+
+        with game_state.batch_notifications():
+            game_state.set_phase(Phase.UPKEEP)
+            game_state.set_active_player(2)
+            game_state.set_phase(Phase.DRAW)
+            assert changes == []
+
+        assert [change_type for change_type, _ in changes] == ["active_player_changed", "phase_changed"]
+        assert changes[1][1]["new_phase"] == Phase.DRAW
+
+    def test_revision_tracks_state_changes(self):
+        """Test that only state-changing events bump the revision."""
+        game_state = GameState()
+        game_state.initialize_game(1, 2, 20)
+        revision = game_state.revision
+
+        assert game_state.process_event(UnknownEvent(raw_message="unparsed line"))
+        assert game_state.revision == revision
+
+        game_state.set_phase(Phase.UPKEEP)
+        assert game_state.revision > revision
+
+@pytest.fixture
+def state_manager(tmp_path):
+    """State manager persisting under the test's temporary directory."""
+    state_manager = StateManager(persistence_file=str(tmp_path / "game_state.json"))
+    yield state_manager
+    state_manager.shutdown()
+
 class TestStateManager:
     """Test cases for state manager."""
     
-    def test_state_manager_creation(self):
+    def test_state_manager_creation(self, state_manager):
         """Test creating state manager."""
-        state_manager = StateManager()
-        
         assert state_manager.game_state is not None
         assert not state_manager.is_initialized
         
@@ -287,30 +515,42 @@ class TestStateManager:
         assert state_manager.initialize()
         assert state_manager.is_initialized
     
-    def test_event_processing(self):
+    def test_event_processing(self, state_manager):
         """Test event processing."""
-        state_manager = StateManager()
         state_manager.initialize()
         
-        # Create test event
-        from parser.events import GameStartEvent, EventType
-        
-        event = GameStartEvent(
-            event_type=EventType.GAME_START,
-            player_life=20,
-            opponent_life=20
-        )
-        
         # Test processing event
-        assert state_manager.process_event(event)
+        assert state_manager.process_event(GAME_START_EVENT)
         
         # Check state was updated
         game_state = state_manager.get_current_state()
         assert game_state.status == GameStatus.ACTIVE
-    
-    def test_state_validation(self):
+
+    def test_debounced_persistence(self, tmp_path):
+        """Test pending state is written once on shutdown."""
+        persistence_file = tmp_path / "state" / "game_state.json"
+        state_manager = StateManager(persistence_file=str(persistence_file))
+        state_manager.initialize()
+
+        for _ in range(5):
+            assert state_manager.process_event(GAME_START_EVENT)
+
+        state_manager.shutdown()
+        data = json.loads(persistence_file.read_text(encoding='utf-8'))
+        assert data["version"] == "1.0.0"
+        assert data["game_state"]["status"] == GameStatus.ACTIVE
+        assert not persistence_file.with_name(persistence_file.name + ".tmp").exists()
+
+        # A new manager picks the persisted state back up
+        restored = StateManager(persistence_file=str(persistence_file))
+        assert restored.initialize()
+        assert restored.game_state.status == GameStatus.ACTIVE
+        assert len(restored.game_state.event_history) == 5
+        assert restored.game_state.event_history.maxlen == EVENT_HISTORY_LIMIT
+        restored.shutdown()
+
+    def test_state_validation(self, state_manager):
         """Test state validation."""
-        state_manager = StateManager()
         state_manager.initialize()
         
         # Test validation of empty state
@@ -318,21 +558,217 @@ class TestStateManager:
         assert isinstance(errors, list)
         
         # Test validation after game start
-        from parser.events import GameStartEvent, EventType
-        
-        event = GameStartEvent(
-            event_type=EventType.GAME_START,
-            player_life=20,
-            opponent_life=20
-        )
-        
-        state_manager.process_event(event)
+        state_manager.process_event(GAME_START_EVENT)
         errors = state_manager.validate_state()
         assert isinstance(errors, list)
+
+    def test_event_log_replay(self, tmp_path):
+        """Test events logged after the last snapshot are replayed on startup."""
+        persistence_file = tmp_path / "game_state.json"
+        state_manager = StateManager(persistence_file=str(persistence_file))
+        state_manager.initialize()
+        state_manager.game_state.initialize_game(1, 2, 20)
+        assert state_manager.process_event(GameStartEvent(player_life=20, opponent_life=20))
+        state_manager.shutdown()
+
+        # Events after the snapshot only reach the log before the "crash"
+        state_manager = StateManager(persistence_file=str(persistence_file))
+        state_manager.initialize()
+        assert state_manager.process_event(LifeChangeEvent(player=1, old_life=20, new_life=17, change=-3))
+
+        recovered = StateManager(persistence_file=str(persistence_file))
+        assert recovered.initialize()
+        assert recovered.game_state.self_player.life_total == 17
+        assert len(recovered.game_state.event_history) == 2
+        recovered.shutdown()
+        state_manager.shutdown()
+
+    def test_event_log_created_on_first_event(self, state_manager):
+        """Test starting up does not create an event log until an event is logged."""
+        log_path = state_manager._log_path
+        assert state_manager.initialize()
+        assert not log_path.exists()
+
+        assert state_manager.process_event(GAME_START_EVENT)
+        assert log_path.exists()
+
+    def test_event_log_replay_does_not_notify(self, tmp_path):
+        """Test replayed events are not reported to state change callbacks again."""
+        persistence_file = tmp_path / "game_state.json"
+        state_manager = StateManager(persistence_file=str(persistence_file))
+        state_manager.initialize()
+        assert state_manager.process_event(GAME_START_EVENT)
+
+        recovered = StateManager(persistence_file=str(persistence_file))
+        changes = []
+        recovered.add_state_change_callback(lambda change_type, data: changes.append(change_type))
+        assert recovered.initialize()
+        assert recovered.game_state.status == GameStatus.ACTIVE
+        assert changes == []
+
+        # Callbacks are back in place once replay is done
+        recovered.game_state.set_phase(Phase.UPKEEP)
+        assert changes == ["phase_changed"]
+        recovered.shutdown()
+        state_manager.shutdown()
+
+    def test_snapshot_compacts_event_log(self, state_manager):
+        """Test every snapshot write drops the events it covers from the log."""
+        state_manager.initialize()
+        for _ in range(2):
+            assert state_manager.process_event(GAME_START_EVENT)
+            assert state_manager._persist_state()
+            assert state_manager._snapshot_seq == state_manager._event_seq
+            assert state_manager._log_path.read_bytes() == b''
+
+    def test_event_log_bounded_without_state_changes(self, state_manager):
+        """Test events that leave the revision alone are still compacted out of the log."""
+        state_manager.initialize()
+        for _ in range(2 * SNAPSHOT_EVENTS + 10):
+            assert state_manager.process_event(UnknownEvent(raw_message="unparsed line"))
+        state_manager.flush()
+
+        logged = state_manager._event_seq - state_manager._snapshot_seq
+        assert logged < SNAPSHOT_EVENTS
+        assert len(state_manager._log_path.read_bytes().splitlines()) == logged
+
+    def test_changes_outside_events_survive_restart(self, tmp_path):
+        """Test state changed outside an event is snapshotted before later events are replayed."""
+        persistence_file = tmp_path / "game_state.json"
+        state_manager = StateManager(persistence_file=str(persistence_file))
+        state_manager.initialize()
+        state_manager.game_state.initialize_game(1, 2, 20)
+        assert state_manager.process_event(GAME_START_EVENT)
+        state_manager.flush()
+        assert state_manager.process_event(LifeChangeEvent(player=1, old_life=20, new_life=15, change=-5))
+
+        # Restart without a shutdown, as after a crash
+        recovered = StateManager(persistence_file=str(persistence_file))
+        assert recovered.initialize()
+        assert recovered.game_state.self_player is not None
+        assert recovered.game_state.self_player.life_total == 15
+        recovered.shutdown()
+        state_manager.shutdown()
+
+    def test_unloadable_snapshot_discards_event_log(self, tmp_path):
+        """Test events logged against a snapshot that cannot be loaded never come back."""
+        persistence_file = tmp_path / "game_state.json"
+        state_manager = StateManager(persistence_file=str(persistence_file))
+        state_manager.initialize()
+        state_manager.game_state.initialize_game(1, 2, 20)
+        assert state_manager.process_event(GAME_START_EVENT)
+        state_manager.flush()
+        for new_life in (18, 16, 14):
+            assert state_manager.process_event(
+                LifeChangeEvent(player=1, old_life=new_life + 2, new_life=new_life, change=-2))
+        persistence_file.write_bytes(b'{"timestamp":"2024-01-01T00:00:00","version":"0.9.0"}')
+
+        restarted = StateManager(persistence_file=str(persistence_file))
+        assert restarted.initialize()
+        assert restarted.game_state.self_player is None
+        restarted.game_state.initialize_game(1, 2, 20)
+        restarted.flush()
+        assert restarted.process_event(LifeChangeEvent(player=1, old_life=20, new_life=19, change=-1))
+
+        # Only the new game's event is logged, and a restart replays only that
+        assert len(restarted._log_path.read_bytes().splitlines()) == 1
+        recovered = StateManager(persistence_file=str(persistence_file))
+        assert recovered.initialize()
+        assert recovered.game_state.self_player.life_total == 19
+        assert len(recovered.game_state.event_history) == 1
+        recovered.shutdown()
+        restarted.shutdown()
+        state_manager.shutdown()
+
+    def test_torn_event_log_line_truncated(self, tmp_path):
+        """Test events appended after a torn log line are still replayed."""
+        persistence_file = tmp_path / "game_state.json"
+        state_manager = StateManager(persistence_file=str(persistence_file))
+        state_manager.initialize()
+        state_manager.game_state.initialize_game(1, 2, 20)
+        assert state_manager.process_event(GAME_START_EVENT)
+        state_manager.flush()
+        assert state_manager.process_event(LifeChangeEvent(player=1, old_life=20, new_life=17, change=-3))
+        log_path = state_manager._log_path
+        with open(log_path, 'ab') as f:
+            f.write(b'{"seq":2,"eve')
+
+        restarted = StateManager(persistence_file=str(persistence_file))
+        assert restarted.initialize()
+        assert restarted.game_state.self_player.life_total == 17
+        assert restarted.process_event(LifeChangeEvent(player=1, old_life=17, new_life=12, change=-5))
+
+        recovered = StateManager(persistence_file=str(persistence_file))
+        assert recovered.initialize()
+        assert recovered.game_state.self_player.life_total == 12
+        recovered.shutdown()
+        restarted.shutdown()
+        state_manager.shutdown()
+
+    def test_persisted_version_mismatch(self, tmp_path):
+        """Test a state file from another version is skipped without parsing the state."""
+        persistence_file = tmp_path / "game_state.json"
+        persistence_file.write_bytes(
+            b'{"timestamp":"2024-01-01T00:00:00","version":"0.9.0","game_state":{"status":"not-a-status"}}'
+        )
+
+        state_manager = StateManager(persistence_file=str(persistence_file))
+        assert not state_manager._load_persisted_state()
+        assert state_manager.game_state.status == GameStatus.WAITING
+
+    def test_state_change_callbacks(self, state_manager):
+        """Test that a failing callback does not stop the others."""
+        changes = []
+
+        def failing_callback(change_type, data):
+            raise RuntimeError("boom")
+
+        def recording_callback(change_type, data):
+            changes.append(change_type)
+
+        state_manager.add_state_change_callback(failing_callback)
+        state_manager.add_state_change_callback(recording_callback)
+        state_manager.game_state.initialize_game(1, 2, 20)
+        assert changes == ["game_initialized"]
+
+        assert state_manager.remove_state_change_callback(recording_callback)
+        assert not state_manager.remove_state_change_callback(recording_callback)
+
+    def test_callback_removes_itself(self, state_manager):
+        """Test a callback can unregister itself while changes are dispatched."""
+        changes = []
+
+        def one_shot_callback(change_type, data):
+            changes.append(change_type)
+            state_manager.remove_state_change_callback(one_shot_callback)
+
+        state_manager.add_state_change_callback(one_shot_callback)
+        state_manager.game_state.initialize_game(1, 2, 20)
+        state_manager.game_state.set_phase(Phase.UPKEEP)
+        assert changes == ["game_initialized"]
+
+    def test_duplicate_card_validation(self, state_manager):
+        """Test that duplicate instance IDs in a zone are reported."""
+        state_manager.game_state.initialize_game(1, 2, 20)
+        card = CardInfo(instance_id=1, grp_id=12345, name="Lightning Bolt", controller=1, zone_id=2)
+
+        state_manager.game_state.self_player.hand.add_card(card)
+        assert not any("duplicate" in error for error in state_manager.validate_state())
+
+        state_manager.game_state.self_player.hand.add_card(card)
+        assert "self player has duplicate cards in hand" in state_manager.validate_state()
+
+    def test_validation_cache_invalidation(self, state_manager):
+        """Test cached validation results follow state changes."""
+        state_manager.game_state.initialize_game(1, 2, 20)
+        assert state_manager.validate_state() == state_manager.validate_state()
+        assert "Self player has negative life total" not in state_manager.validate_state()
+
+        state_manager.game_state.self_player.life_total = -1
+        assert "Self player has negative life total" in state_manager.validate_state()
     
-    def test_state_statistics(self):
+    def test_state_statistics(self, state_manager):
         """Test state statistics."""
-        state_manager = StateManager()
         state_manager.initialize()
         
         stats = state_manager.get_state_statistics()
@@ -341,24 +777,56 @@ class TestStateManager:
         assert "status" in stats
         assert "turn_number" in stats
         assert "event_count" in stats
+        assert "validation_errors" not in stats
+        
+        stats = state_manager.get_state_statistics(include_validation=True)
         assert "validation_errors" in stats
 
+        # Unchanged state returns equal statistics; changing the result leaves the cache intact
+        stats["game_id"] = "changed"
+        assert state_manager.get_state_statistics(include_validation=True)["game_id"] != "changed"
+        state_manager.game_state.initialize_game(1, 2, 20)
+        stats = state_manager.get_state_statistics()
+        assert stats["self_player"]["life_total"] == 20
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def integration(tmp_path_factory):
+    """State integration started once and shared by the module's async tests."""
+    persistence_file = tmp_path_factory.mktemp("integration") / "game_state.json"
+    integration = StateIntegration(websocket_port=0, persistence_file=str(persistence_file))
+    assert await integration.start()
+    yield integration
+    await integration.stop()
+
 class TestStateIntegration:
     """Test cases for state integration."""
     
-    @pytest.mark.asyncio
-    async def test_state_integration_creation(self):
+    def test_state_integration_creation(self, tmp_path):
         """Test creating state integration."""
-        integration = StateIntegration(port=8766)  # Use different port for testing
+        integration = StateIntegration(websocket_port=0, persistence_file=str(tmp_path / "game_state.json"))
         
         assert integration.state_manager is not None
         assert integration.event_bus is not None
         assert not integration.is_running
     
     @pytest.mark.asyncio
-    async def test_state_integration_lifecycle(self):
+    async def test_unchanged_summary_not_rebroadcast(self, tmp_path):
+        """Test a state update is only queued when the summary changed."""
+        integration = StateIntegration(websocket_port=0, persistence_file=str(tmp_path / "game_state.json"))
+        queue = integration.event_bus.event_queue
+
+        await integration._broadcast_state_update()
+        await integration._broadcast_state_update()
+        assert queue.qsize() == 1
+
+        integration.state_manager.game_state.initialize_game(1, 2, 20)
+        await integration._broadcast_state_update()
+        assert queue.qsize() == 2
+    
+    @pytest.mark.asyncio
+    async def test_state_integration_lifecycle(self, tmp_path):
         """Test state integration lifecycle."""
-        integration = StateIntegration(port=8767)  # Use different port for testing
+        integration = StateIntegration(websocket_port=0, persistence_file=str(tmp_path / "game_state.json"))
         
         try:
             # Test starting
@@ -374,63 +842,33 @@ class TestStateIntegration:
             await integration.stop()
             raise e
     
-    @pytest.mark.asyncio
-    async def test_event_processing(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_event_processing(self, integration):
         """Test event processing in integration."""
-        integration = StateIntegration(port=8768)  # Use different port for testing
+        # Test processing event
+        assert await integration.process_event(GAME_START_EVENT)
         
-        try:
-            await integration.start()
-            
-            # Create test event
-            from parser.events import GameStartEvent, EventType
-            
-            event = GameStartEvent(
-                event_type=EventType.GAME_START,
-                player_life=20,
-                opponent_life=20
-            )
-            
-            # Test processing event
-            assert await integration.process_event(event)
-            
-            # Check state was updated
-            assert integration.is_game_active()
-            
-        finally:
-            await integration.stop()
+        # Check state was updated
+        assert integration.is_game_active()
     
-    @pytest.mark.asyncio
-    async def test_state_callbacks(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_state_callbacks(self, integration):
         """Test state change callbacks."""
-        integration = StateIntegration(port=8769)  # Use different port for testing
-        
-        callback_events = []
+        callback_events = deque(maxlen=64)
         
         def test_callback(change_type: str, data: Dict[str, Any]):
             callback_events.append((change_type, data))
         
+        integration.add_state_callback(test_callback)
         try:
-            await integration.start()
-            integration.add_state_callback(test_callback)
-            
-            # Create test event
-            from parser.events import GameStartEvent, EventType
-            
-            event = GameStartEvent(
-                event_type=EventType.GAME_START,
-                player_life=20,
-                opponent_life=20
-            )
-            
             # Process event
-            await integration.process_event(event)
+            await integration.process_event(GAME_START_EVENT)
             
             # Check callback was called
             assert len(callback_events) > 0
             
         finally:
-            await integration.stop()
+            integration.remove_state_callback(test_callback)
 
 def run_manual_tests():
     """Run manual tests for state management."""
@@ -448,15 +886,7 @@ def run_manual_tests():
     print(f"   Mana pool: {player.get_mana_summary()}")
     
     # Test hand
-    card = CardInfo(
-        instance_id=1,
-        grp_id=12345,
-        name="Lightning Bolt",
-        controller=1,
-        zone_id=2,
-        zone_type=ZoneType.HAND
-    )
-    player.hand.add_card(card)
+    player.hand.add_card(LIGHTNING_BOLT.model_copy())
     print(f"   Hand size: {player.hand.size()}")
     
     # Test 2: Game State
@@ -470,26 +900,19 @@ def run_manual_tests():
     state_manager = StateManager()
     state_manager.initialize()
     print(f"   State manager initialized: {state_manager.is_initialized}")
+    state_manager.shutdown()
     
     # Test 4: State Integration
     print("4. Testing state integration...")
-    integration = StateIntegration(port=8770)
+    integration = StateIntegration(websocket_port=0)
     
     async def test_integration():
         try:
             await integration.start()
-            print("   State integration started")
+            print(f"   State integration started on port {integration.event_bus.event_bus.port}")
             
             # Test event processing
-            from parser.events import GameStartEvent, EventType
-            
-            event = GameStartEvent(
-                event_type=EventType.GAME_START,
-                player_life=20,
-                opponent_life=20
-            )
-            
-            success = await integration.process_event(event)
+            success = await integration.process_event(GAME_START_EVENT)
             print(f"   Event processed: {success}")
             
             # Test state summary
@@ -500,8 +923,17 @@ def run_manual_tests():
             await integration.stop()
             print("   State integration stopped")
     
-    # Run async test
-    asyncio.run(test_integration())
+    # Run async steps on one loop; further steps can be gathered onto it
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(test_integration())
+    finally:
+        # Cancel background tasks (e.g. heartbeats) before closing, as asyncio.run does
+        pending = asyncio.all_tasks(loop)
+        for task in pending:
+            task.cancel()
+        loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        loop.close()
     
     print("Manual tests completed!")
 